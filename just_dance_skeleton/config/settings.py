@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 
 # Camera Settings
 CAMERA_WIDTH = 1280
@@ -7,10 +8,17 @@ CAMERA_FPS = 30
 WEBCAM_ID = 0
 
 # Pose Detection Settings
-POSE_INFERENCE_WIDTH = 480  # Downscaled for PC to live
-POSE_INFERENCE_HEIGHT = 360
+# Downscaled for PC to live. MediaPipe's landmark model runs at 256x256, so a
+# 256px short side loses nothing; keeping the camera's aspect ratio means the
+# normalized keypoints map straight back onto the full frame
+POSE_INFERENCE_HEIGHT = 256
+POSE_INFERENCE_WIDTH = round(POSE_INFERENCE_HEIGHT * CAMERA_WIDTH / CAMERA_HEIGHT)
 POSE_MIN_DETECTION_CONFIDENCE = 0.7
 POSE_MIN_TRACKING_CONFIDENCE = 0.5
+# 0=Lite (~2x faster), 1=Full, 2=Heavy
+POSE_MODEL_COMPLEXITY = 1
+# Frames to skip between inferences; skipped frames reuse the last pose
+POSE_FRAME_SKIP = 0
 
 # Rendering Settings
 GREEN_RGB = (0, 255, 0)
@@ -28,6 +36,30 @@ GLOW_COLOR = YELLOW_RGB
 POSE_MATCH_THRESHOLD = 0.6
 MAX_POSE_DISTANCE = 100  # for matching
 NORMALIZATION_KEYPOINTS = ["LEFT_SHOULDER", "RIGHT_SHOULDER"]
+# Also accept the left/right mirror image of each dance pose. Off by default:
+# it changes the scores of asymmetric poses
+POSE_MATCH_MIRROR_INVARIANT = False
+# Detected poses with fewer confident important keypoints (40% of the 12) are
+# not matched at all, e.g. while the player is out of frame
+POSE_MATCH_MIN_VISIBLE_KEYPOINTS = 5
+# Libraries with at least this many rows (mirrored poses included) are
+# prefiltered with an approximate nearest-neighbour index when hnswlib is
+# installed; only the closest candidates are then scored exactly
+POSE_INDEX_MIN_POSES = 256
+POSE_INDEX_CANDIDATES = 8
+# match_pose remembers results for this many recent poses, keyed by the
+# normalized joints snapped to a grid of POSE_MATCH_CACHE_QUANTUM units
+# (shoulder width = 100), so a held pose skips the library scan; 0 disables
+POSE_MATCH_CACHE_SIZE = 64
+POSE_MATCH_CACHE_QUANTUM = 2.0
+# Joint-angle matching: similarity is 1 - mean angle error / pi
+ANGLE_MATCH_THRESHOLD = 0.9  # perfect, ~18 degrees mean error
+ANGLE_MATCH_GOOD_THRESHOLD = 0.8
+# Below this similarity (chance level is 0.5) there is no angle match at all
+ANGLE_MATCH_MIN_SIMILARITY = 0.6
+# Angles (of the 8 elbow/shoulder/hip/knee angles) that must be measurable in
+# both poses before they are compared
+ANGLE_MATCH_MIN_VALID_ANGLES = 4
 
 # Game Settings
 TARGET_FPS = 30
@@ -84,6 +116,8 @@ POSE_CONNECTIONS = [
     (30, 32),
     (28, 32),
 ]
+# Same connections as an (N, 2) index array for vectorised drawing
+POSE_CONNECTIONS_ARR = np.asarray(POSE_CONNECTIONS, dtype=np.int32)
 
 # Keypoint names mapping (MediaPipe Pose landmark indices)
 KEYPOINT_NAMES = {
@@ -122,6 +156,9 @@ KEYPOINT_NAMES = {
     32: "RIGHT_FOOT_INDEX",
 }
 
+# Reverse lookup: keypoint name -> MediaPipe landmark index
+KEYPOINT_INDICES = {name: idx for idx, name in KEYPOINT_NAMES.items()}
+
 # Important keypoints for dance pose matching
 IMPORTANT_KEYPOINTS = [
     11,
@@ -137,6 +174,8 @@ IMPORTANT_KEYPOINTS = [
     27,
     28,  # Ankles
 ]
+# Fancy-index form of IMPORTANT_KEYPOINTS (same order as IMPORTANT_KEYPOINT_NAMES)
+IMPORTANT_KEYPOINTS_ARR = np.asarray(IMPORTANT_KEYPOINTS, dtype=np.int32)
 
 # Semantic keypoint set for cross-format matching (15-point and 33-point poses)
 IMPORTANT_KEYPOINT_NAMES = [
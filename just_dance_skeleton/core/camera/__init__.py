@@ -1,7 +1,15 @@
 """Camera source implementations"""
 
 from .base import CameraSource
-from .kinect import KinectSource
 from .webcam import WebcamSource
 
 __all__ = ["CameraSource", "WebcamSource", "KinectSource"]
+
+
+def __getattr__(name):
+    # KinectSource will need libfreenect, so it's only imported when asked for
+    if name == "KinectSource":
+        from .kinect import KinectSource
+
+        return KinectSource
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
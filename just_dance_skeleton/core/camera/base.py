@@ -12,6 +12,9 @@ class CameraSource(ABC):
         self.height = height
         self.fps = fps
         self.is_opened = False
+        # Whether frames should be shown mirrored. Sources hand out frames
+        # unflipped; the display and pose tracker apply the mirror themselves.
+        self.mirror = False
 
     @abstractmethod
     def open(self) -> bool:
@@ -23,10 +26,19 @@ class CameraSource(ABC):
         """
         Read a frame from the camera.
         Returns (success, frame) tuple.
-        Frame is BGR format numpy array or None if failed.
+        Frame is a uint8 BGR numpy array or None if failed. The caller owns
+        it: the source never touches it again, so it may be drawn on in place.
         """
         pass
 
+    def read_inference_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Get the pose-inference input for the frame last returned by read_frame.
+        Sources that can cheaply produce a downscaled uint8 RGB frame override this;
+        returns (False, None) when the caller should prepare its own.
+        """
+        return False, None
+
     @abstractmethod
     def close(self) -> None:
         """Close the camera source and release resources."""
@@ -1,28 +1,99 @@
-from typing import Optional, Tuple
+import glob
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
 
 import cv2
 import numpy as np
+from config.settings import POSE_INFERENCE_HEIGHT, POSE_INFERENCE_WIDTH
 
 from .base import CameraSource
 
 
+def _default_backend() -> int:
+    """
+    Native capture API for this platform
+    Without an explicit backend OpenCV tries the MJPEG and FFMPEG readers
+    first, which can stall open() for seconds while they sniff the stream.
+    """
+    if sys.platform.startswith("linux"):
+        return cv2.CAP_V4L2
+    if sys.platform == "win32":
+        return cv2.CAP_MSMF
+    if sys.platform == "darwin":
+        return cv2.CAP_AVFOUNDATION
+    return cv2.CAP_ANY
+
+
 class WebcamSource(CameraSource):
-    """Webcam camera source implementation using OpenCV"""
+    """
+    Webcam camera source implementation using OpenCV
+    Frames are captured on a background thread; read_frame hands out the
+    most recent one so the driver buffer never backs up behind the game loop.
+    """
+
+    # Seconds to wait for a fresh frame before reporting a read failure
+    read_timeout = 1.0
+    # Seconds to wait for index probes in list_available_cameras
+    probe_timeout = 0.5
+
+    # Per-node V4L2 details on Linux, see _is_capture_node
+    sysfs_video_root = "/sys/class/video4linux"
+
+    _available_cameras: Optional[List[int]] = None
 
     def __init__(
-        self, camera_id: int = 0, width: int = 1280, height: int = 720, fps: int = 30
+        self,
+        camera_id: Union[int, str] = 0,
+        width: int = 1280,
+        height: int = 720,
+        fps: int = 30,
+        backend: Optional[int] = None,
     ):
         super().__init__(width, height, fps)
         self.camera_id = camera_id
+        # cv2.CAP_* capture API; None picks the platform's native one
+        self.backend = _default_backend() if backend is None else backend
         self.cap = None
+        # Mirror view is more natural for users
+        self.mirror = True
+
+        # Pose inference input, produced alongside each display frame
+        self._infer_size = (POSE_INFERENCE_WIDTH, POSE_INFERENCE_HEIGHT)
+        self._inference_frame: Optional[np.ndarray] = None
+
+        # Single-slot handoff between the capture thread and read_frame
+        self._frame_ready = threading.Condition()
+        self._latest: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._capture_failed = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Who releases the capture: close() normally does, but if the reader
+        # is still stuck in cap.grab() it hands the release over to the reader
+        # ({"running": bool, "release": bool}, replaced on every open)
+        self._release_lock = threading.Lock()
+        self._reader_state = {"running": False, "release": False}
 
     def open(self) -> bool:
         """Open the webcam"""
         try:
-            self.cap = cv2.VideoCapture(self.camera_id)
+            # Device paths (e.g. "/dev/video0") work too; V4L2 honours
+            # CAP_PROP_BUFFERSIZE
+            self.cap = cv2.VideoCapture(self.camera_id, self.backend)
             if not self.cap.isOpened():
                 return False
 
+            # Keep a single frame queued so reads never return stale frames
+            if not self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                print("Webcam: backend ignored CAP_PROP_BUFFERSIZE")
+
+            # MJPG must be requested before the resolution; raw YUYV caps
+            # most webcams well below 30fps at 720p
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter.fourcc(*"MJPG"))
+
             # Set camera properties
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
@@ -35,6 +106,18 @@ class WebcamSource(CameraSource):
 
             print(f"Webcam opened: {actual_width}x{actual_height} @ {actual_fps}fps")
 
+            self._latest = None
+            self._inference_frame = None
+            self._capture_failed = False
+            self._stop = threading.Event()
+            self._reader_state = {"running": True, "release": False}
+            self._thread = threading.Thread(
+                target=self._reader,
+                args=(self.cap, self._stop, self._reader_state),
+                daemon=True,
+            )
+            self._thread.start()
+
             self.is_opened = True
             return True
 
@@ -42,28 +125,89 @@ class WebcamSource(CameraSource):
             print(f"Failed to open webcam {self.camera_id}: {e}")
             return False
 
+    def _reader(self, cap, stop: threading.Event, state: dict) -> None:
+        """Capture loop: drain the driver and keep only the newest frame"""
+        try:
+            while not stop.is_set():
+                if not cap.grab():
+                    break
+
+                ret, frame = cap.retrieve()
+                if not ret or frame is None:
+                    continue
+
+                # Small RGB copy for MediaPipe, built once while the frame is hot.
+                # Both steps keep uint8, so neither buffer is ever widened to float
+                inference_frame = cv2.cvtColor(
+                    cv2.resize(frame, self._infer_size, interpolation=cv2.INTER_AREA),
+                    cv2.COLOR_BGR2RGB,
+                )
+
+                # Each step allocates a fresh buffer, so swapping the reference
+                # is enough - older frames are simply dropped
+                with self._frame_ready:
+                    self._latest = (frame, inference_frame)
+                    self._frame_ready.notify()
+
+        except Exception as e:
+            print(f"Error reading frame: {e}")
+
+        with self._frame_ready:
+            self._capture_failed = True
+            self._frame_ready.notify_all()
+
+        with self._release_lock:
+            state["running"] = False
+            release = state["release"]
+        if release:
+            # close() gave up waiting for this thread and left the capture to it
+            cap.release()
+
     def read_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
-        """Read a frame from the webcam"""
+        """
+        Read the latest frame from the webcam
+        Waits for a frame newer than the previous read; the returned buffer
+        belongs to the caller.
+        """
         if not self.is_opened or self.cap is None:
             return False, None
 
-        try:
-            ret, frame = self.cap.read()
-            if ret and frame is not None:
-                # Flip horizontally for mirror effect (more natural for users)
-                frame = cv2.flip(frame, 1)
-                return True, frame
+        with self._frame_ready:
+            self._frame_ready.wait_for(
+                lambda: self._latest is not None or self._capture_failed,
+                timeout=self.read_timeout,
+            )
+            latest, self._latest = self._latest, None
+
+        if latest is None:
+            self._inference_frame = None
             return False, None
 
-        except Exception as e:
-            print(f"Error reading frame: {e}")
+        frame, self._inference_frame = latest
+        return True, frame
+
+    def read_inference_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Downscaled RGB copy of the frame last returned by read_frame"""
+        if self._inference_frame is None:
             return False, None
+        return True, self._inference_frame
 
     def close(self) -> None:
         """Close the webcam and release resources"""
-        if self.cap is not None:
-            self.cap.release()
-            self.cap = None
+        self._stop.set()
+        cap, self.cap = self.cap, None
+        if self._thread is not None:
+            self._thread.join(timeout=self.read_timeout)
+            with self._release_lock:
+                if self._reader_state["running"]:
+                    # Still blocked in cap.grab(): releasing the capture under
+                    # it can crash, so the reader releases it once grab returns
+                    self._reader_state["release"] = True
+                    cap = None
+            self._thread = None
+
+        if cap is not None:
+            cap.release()
         self.is_opened = False
         print("Webcam closed")
 
@@ -73,7 +217,7 @@ class WebcamSource(CameraSource):
             return self.cap.isOpened()
 
         # Try to open temporarily to check availability
-        temp_cap = cv2.VideoCapture(self.camera_id)
+        temp_cap = cv2.VideoCapture(self.camera_id, self.backend)
         if temp_cap.isOpened():
             temp_cap.release()
             return True
@@ -93,13 +237,74 @@ class WebcamSource(CameraSource):
             return self.cap.get(cv2.CAP_PROP_FPS)
         return float(self.fps)
 
-    @staticmethod
-    def list_available_cameras() -> list:
-        """List all available camera indices"""
-        available_cameras = []
-        for i in range(10):  # Check first 10 camera indices
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                available_cameras.append(i)
-                cap.release()
-        return available_cameras
+    @classmethod
+    def list_available_cameras(cls, refresh: bool = False) -> list:
+        """
+        List all available camera indices
+        The result is cached for the process; pass refresh=True to rescan.
+        """
+        if cls._available_cameras is None or refresh:
+            if sys.platform.startswith("linux"):
+                cls._available_cameras = cls._list_video_devices()
+            else:
+                cls._available_cameras = cls._probe_camera_indices()
+        return list(cls._available_cameras)
+
+    @classmethod
+    def _list_video_devices(cls) -> List[int]:
+        """Indices of /dev/videoN capture nodes - no capture is opened"""
+        indices = []
+        for path in glob.glob("/dev/video*"):
+            match = re.search(r"video(\d+)$", path)
+            if match and cls._is_capture_node(match.group(1)):
+                indices.append(int(match.group(1)))
+        return sorted(indices)
+
+    @classmethod
+    def _is_capture_node(cls, number: str) -> bool:
+        """
+        Whether /dev/video<number> is a device's first (capture) node
+        UVC webcams also expose a metadata-only node with sysfs index 1, which
+        would otherwise list one camera twice. Nodes without sysfs info count.
+        """
+        index_file = Path(cls.sysfs_video_root) / f"video{number}" / "index"
+        try:
+            return int(index_file.read_text().strip()) == 0
+        except (OSError, ValueError):
+            return True
+
+    @classmethod
+    def _probe_camera_indices(cls) -> List[int]:
+        """Try opening the first 10 indices in parallel, giving up on slow ones"""
+        # Same backend as open(), so every listed index is one open() can use
+        backend = _default_backend()
+
+        # Index -> whether it opened; written by the probe threads
+        opened: Dict[int, bool] = {}
+
+        def _probe(index: int) -> None:
+            try:
+                cap = cv2.VideoCapture(index, backend)
+                try:
+                    opened[index] = cap.isOpened()
+                finally:
+                    cap.release()
+            except Exception:
+                opened[index] = False
+
+        # Plain daemon threads rather than an executor: executor workers are
+        # joined at interpreter exit, so a probe stuck in the driver would
+        # still hang shutdown
+        threads = [
+            threading.Thread(target=_probe, args=(index,), daemon=True)
+            for index in range(10)  # Check first 10 camera indices
+        ]
+        for thread in threads:
+            thread.start()
+
+        deadline = time.monotonic() + cls.probe_timeout
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+
+        # Probes that are still stuck in the driver are left behind
+        return sorted(index for index, ok in list(opened.items()) if ok)
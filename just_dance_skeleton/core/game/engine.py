@@ -1,11 +1,12 @@
-import random
+import math
 import time
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
+import numpy as np
 from config.settings import SCORE_DECAY_RATE
 
 from ..pose.matcher import DancePoseMatcher
-from ..pose.models import GameState, Pose, PoseMatch
+from ..pose.models import DancePose, GameState, Pose, PoseMatch
 from .scoring import ScoringEngine
 
 
@@ -16,31 +17,47 @@ class GameEngine:
         self,
         pose_matcher: DancePoseMatcher,
         scoring_engine: Optional[ScoringEngine] = None,
+        seed: Optional[int] = None,
     ):
         self.pose_matcher = pose_matcher
         self.scoring_engine = scoring_engine or ScoringEngine()
         self.game_state = GameState()
-        self.target_pose_sequence: List[str] = []
+        self.target_pose_sequence: List[DancePose] = []
         self.current_pose_index = 0
         self.pose_hold_time = 2.0  # Seconds to hold each pose
         self.pose_start_time = None
-        self.last_update_time = time.time()
+        self.last_update_time = time.monotonic()
+        # SCORE_DECAY_RATE ** dt == exp(log(SCORE_DECAY_RATE) * dt); GameState
+        # applies it lazily whenever the score is read
+        self._log_decay = math.log(SCORE_DECAY_RATE)
+        # Pass a seed for reproducible pose sequences
+        self._rng = np.random.default_rng(seed)
 
     def start_game(self, pose_sequence: Optional[List[str]] = None) -> None:
-        """Start a new game session"""
-        self.game_state = GameState()
-        self.game_state.is_playing = True
-        self.game_state.start_time = time.time()
-        self.last_update_time = time.time()
+        """
+        Start a new game session
+        `pose_sequence` lists pose names; names the matcher doesn't know are skipped.
+        """
+        now = time.monotonic()
+        self.game_state = GameState(
+            is_playing=True,
+            start_time=now,
+            score_time=now,
+            score_log_decay=self._log_decay,
+        )
+        self.last_update_time = now
 
         # Set up pose sequence
         if pose_sequence:
-            self.target_pose_sequence = pose_sequence
+            dance_poses = self.pose_matcher.dance_poses
+            self.target_pose_sequence = [
+                dance_poses[name] for name in pose_sequence if name in dance_poses
+            ]
         else:
             # Create random sequence from available poses
             available_poses = self.pose_matcher.get_pose_names()
             if available_poses:
-                self.target_pose_sequence = random.choices(available_poses, k=5)
+                self.target_pose_sequence = self._sample_poses(available_poses, 5)
             else:
                 self.target_pose_sequence = []
 
@@ -53,30 +70,28 @@ class GameEngine:
     def stop_game(self) -> None:
         """Stop the current game session"""
         self.game_state.is_playing = False
-        print(f"Game ended! Final score: {self.game_state.score:.1f}")
+        now = time.monotonic()
+        self.game_state.freeze_score(now)
+        print(f"Game ended! Final score: {self.game_state.score_at(now):.1f}")
 
     def update(self, detected_pose: Optional[Pose]) -> None:
         """Update game state with new pose detection"""
         if not self.game_state.is_playing:
             return
 
-        current_time = time.time()
-        dt = current_time - self.last_update_time
-        self.last_update_time = current_time
+        now = time.monotonic()
+        self.last_update_time = now
 
         self.game_state.frame_count += 1
         self.game_state.current_pose = detected_pose
 
-        # Apply score decay over time
-        self.game_state.score *= SCORE_DECAY_RATE**dt
-
         if detected_pose and self.game_state.target_pose:
             # Match current pose against target
             pose_match = self.pose_matcher.match_pose(detected_pose)
 
             if pose_match and pose_match.pose_name == self.game_state.target_pose.name:
                 self.game_state.current_match = pose_match
-                self._handle_pose_match(pose_match, current_time)
+                self._handle_pose_match(pose_match, now)
             else:
                 self.game_state.current_match = None
                 # Reset pose timing if not matching
@@ -86,24 +101,24 @@ class GameEngine:
         else:
             self.game_state.current_match = None
 
-    def _handle_pose_match(self, pose_match: PoseMatch, current_time: float) -> None:
+    def _handle_pose_match(self, pose_match: PoseMatch, now: float) -> None:
         """Handle successful pose matching"""
         if pose_match.is_good_match:
             # Start timing if this is the first good match
             if self.pose_start_time is None:
-                self.pose_start_time = current_time
+                self.pose_start_time = now
 
             # Check if pose has been held long enough
-            hold_duration = current_time - self.pose_start_time
+            hold_duration = now - self.pose_start_time
 
             if hold_duration >= self.pose_hold_time:
-                self._complete_pose(pose_match)
+                self._complete_pose(pose_match, now)
         else:
             # Reset timing for poor matches
             self.pose_start_time = None
             self.game_state.combo_count = 0
 
-    def _complete_pose(self, pose_match: PoseMatch) -> None:
+    def _complete_pose(self, pose_match: PoseMatch, now: float) -> None:
         """Complete current pose and move to next"""
         score_result = self.scoring_engine.calculate_pose_score(
             similarity=pose_match.similarity,
@@ -112,7 +127,7 @@ class GameEngine:
             combo_count=self.game_state.combo_count,
         )
 
-        self.game_state.score += score_result.total_score
+        self.game_state.add_score(score_result.total_score, now)
         self.game_state.combo_count += 1
         self.game_state.last_score_earned = score_result.total_score
         self.game_state.last_judgement = score_result.judgement
@@ -135,27 +150,28 @@ class GameEngine:
 
     def _set_current_target_pose(self) -> None:
         """Set the current target pose from sequence"""
-        if (
-            self.current_pose_index < len(self.target_pose_sequence)
-            and self.target_pose_sequence
-        ):
-            pose_name = self.target_pose_sequence[self.current_pose_index]
-            if pose_name in self.pose_matcher.dance_poses:
-                self.game_state.target_pose = self.pose_matcher.dance_poses[pose_name]
-            else:
-                # Skip invalid pose
-                self.current_pose_index += 1
-                if self.current_pose_index < len(self.target_pose_sequence):
-                    self._set_current_target_pose()
+        if self.current_pose_index < len(self.target_pose_sequence):
+            self.game_state.target_pose = self.target_pose_sequence[
+                self.current_pose_index
+            ]
+
+    def _sample_poses(
+        self, available_poses: Sequence[str], count: int
+    ) -> List[DancePose]:
+        """Pick `count` dance poses at random, with replacement"""
+        dance_poses = self.pose_matcher.dance_poses
+        indices = self._rng.integers(0, len(available_poses), size=count)
+        return [dance_poses[available_poses[i]] for i in indices]
 
     def _generate_new_sequence(self) -> None:
         """Generate a new pose sequence"""
         available_poses = self.pose_matcher.get_pose_names()
         if available_poses:
             # Increase difficulty by adding more poses
-            sequence_length = min(5 + (self.game_state.score // 100), 10)
-            self.target_pose_sequence = random.choices(
-                available_poses, k=sequence_length
+            score = self.game_state.score_at(self.last_update_time)
+            sequence_length = int(min(5 + (score // 100), 10))
+            self.target_pose_sequence = self._sample_poses(
+                available_poses, sequence_length
             )
             self.current_pose_index = 0
             self._set_current_target_pose()
@@ -163,13 +179,17 @@ class GameEngine:
         else:
             self.stop_game()
 
-    def get_progress(self) -> float:
-        """Get progress through current pose (0-1)"""
+    def get_progress(self, now: Optional[float] = None) -> float:
+        """
+        Get progress through current pose (0-1)
+        `now` is a time.monotonic() timestamp; defaults to the current time.
+        """
         if not self.pose_start_time or not self.game_state.is_playing:
             return 0.0
 
-        current_time = time.time()
-        hold_duration = current_time - self.pose_start_time
+        if now is None:
+            now = time.monotonic()
+        hold_duration = now - self.pose_start_time
         return min(hold_duration / self.pose_hold_time, 1.0)
 
     def get_remaining_poses(self) -> int:
@@ -182,10 +202,15 @@ class GameEngine:
             return self.game_state.target_pose.name
         return "None"
 
-    def get_game_time(self) -> float:
-        """Get total game time in seconds"""
+    def get_game_time(self, now: Optional[float] = None) -> float:
+        """
+        Get total game time in seconds
+        `now` is a time.monotonic() timestamp; defaults to the current time.
+        """
         if self.game_state.start_time:
-            return time.time() - self.game_state.start_time
+            if now is None:
+                now = time.monotonic()
+            return now - self.game_state.start_time
         return 0.0
 
     def is_pose_being_held(self) -> bool:
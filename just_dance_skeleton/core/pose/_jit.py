@@ -0,0 +1,85 @@
+"""
+Pose matching kernels
+Compiled with Numba when it is installed, otherwise plain NumPy equivalents.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    NUMBA_AVAILABLE = False
+
+
+def _masked_pose_distances_numpy(
+    detected_xy: np.ndarray,
+    detected_mask: np.ndarray,
+    library_xy: np.ndarray,
+    library_mask: np.ndarray,
+    match_radius: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Average joint distance from one pose (K, 2) to every library pose (P, K, 2)
+    Only joints visible in both poses count. Returns (avg_distance, matched)
+    per library pose; avg_distance is inf when no joints overlap.
+    """
+    diff = library_xy - detected_xy[None]
+    distances = np.sqrt(np.einsum("pkd,pkd->pk", diff, diff))
+    valid = library_mask & detected_mask[None]
+
+    valid_comparisons = valid.sum(axis=1)
+    total_distance = np.where(valid, distances, 0.0).sum(axis=1)
+    avg_distance = np.divide(
+        total_distance,
+        valid_comparisons,
+        out=np.full(total_distance.shape, np.inf, dtype=np.float32),
+        where=valid_comparisons > 0,
+    )
+    matched = (valid & (distances < match_radius)).sum(axis=1)
+
+    return avg_distance, matched
+
+
+# Storage dtype for the stacked dance pose library. Half precision halves the
+# bytes the NumPy kernel streams per match (coordinates are at most a few
+# hundred units, so fp16 is accurate to well under a unit); Numba has no CPU
+# float16 support, so the compiled kernel keeps float32.
+LIBRARY_DTYPE = np.float32 if NUMBA_AVAILABLE else np.float16
+
+
+if NUMBA_AVAILABLE:
+
+    # Bounds are guaranteed by the (P, K) shapes, so skip the checks
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _masked_pose_distances_numba(
+        detected_xy, detected_mask, library_xy, library_mask, match_radius
+    ):
+        num_poses, num_keypoints = library_mask.shape
+        avg_distance = np.full(num_poses, np.inf, dtype=np.float32)
+        matched = np.zeros(num_poses, dtype=np.int64)
+
+        for p in range(num_poses):
+            total = 0.0
+            valid = 0
+            for k in range(num_keypoints):
+                if not (detected_mask[k] and library_mask[p, k]):
+                    continue
+                dx = library_xy[p, k, 0] - detected_xy[k, 0]
+                dy = library_xy[p, k, 1] - detected_xy[k, 1]
+                distance = np.sqrt(dx * dx + dy * dy)
+                total += distance
+                valid += 1
+                if distance < match_radius:
+                    matched[p] += 1
+            if valid > 0:
+                avg_distance[p] = total / valid
+
+        return avg_distance, matched
+
+    masked_pose_distances = _masked_pose_distances_numba
+else:
+    masked_pose_distances = _masked_pose_distances_numpy
@@ -1,41 +1,376 @@
 import json
+import math
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 from config.settings import (
+    ANGLE_MATCH_GOOD_THRESHOLD,
+    ANGLE_MATCH_MIN_SIMILARITY,
+    ANGLE_MATCH_MIN_VALID_ANGLES,
+    ANGLE_MATCH_THRESHOLD,
     IMPORTANT_KEYPOINT_NAMES,
     MAX_POSE_DISTANCE,
     NORMALIZATION_KEYPOINTS,
+    POSE_INDEX_CANDIDATES,
+    POSE_INDEX_MIN_POSES,
+    POSE_MATCH_CACHE_QUANTUM,
+    POSE_MATCH_CACHE_SIZE,
+    POSE_MATCH_MIN_VISIBLE_KEYPOINTS,
+    POSE_MATCH_MIRROR_INVARIANT,
     POSE_MATCH_THRESHOLD,
 )
 
-from .models import DancePose, Pose, PoseMatch
+from ._jit import LIBRARY_DTYPE, masked_pose_distances
+from .models import DancePose, Keypoint, Pose, PoseMatch, mirrored_keypoint_name
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import hnswlib
+except ImportError:  # pragma: no cover - depends on the environment
+    hnswlib = None
+
+_K = len(IMPORTANT_KEYPOINT_NAMES)
+# Row indices into the (K, 3) keypoint arrays, as int arrays so fancy indexing
+# doesn't convert a list on every call
+_NORMALIZATION_ROWS = np.asarray(
+    [IMPORTANT_KEYPOINT_NAMES.index(n) for n in NORMALIZATION_KEYPOINTS],
+    dtype=np.int32,
+)
+
+# Row permutation that swaps left and right joints
+_MIRROR_ROWS = np.asarray(
+    [
+        IMPORTANT_KEYPOINT_NAMES.index(mirrored_keypoint_name(n))
+        for n in IMPORTANT_KEYPOINT_NAMES
+    ],
+    dtype=np.int32,
+)
+
+# (end, joint, end) keypoint triplets; the angle is measured at the middle joint
+_ANGLE_JOINTS = [
+    ("LEFT_SHOULDER", "LEFT_ELBOW", "LEFT_WRIST"),
+    ("RIGHT_SHOULDER", "RIGHT_ELBOW", "RIGHT_WRIST"),
+    ("LEFT_ELBOW", "LEFT_SHOULDER", "LEFT_HIP"),
+    ("RIGHT_ELBOW", "RIGHT_SHOULDER", "RIGHT_HIP"),
+    ("LEFT_SHOULDER", "LEFT_HIP", "LEFT_KNEE"),
+    ("RIGHT_SHOULDER", "RIGHT_HIP", "RIGHT_KNEE"),
+    ("LEFT_HIP", "LEFT_KNEE", "LEFT_ANKLE"),
+    ("RIGHT_HIP", "RIGHT_KNEE", "RIGHT_ANKLE"),
+]
+_ANGLE_TRIPLETS = np.asarray(
+    [[IMPORTANT_KEYPOINT_NAMES.index(n) for n in joint] for joint in _ANGLE_JOINTS],
+    dtype=np.int32,
+)
+# Angle error (radians) under which a joint counts as matched
+_ANGLE_MATCH_TOLERANCE = np.pi / 12
+
+
+# Sample poses with normalized coordinates (0-1 range), written out when no
+# poses file exists. Rows are (x, y, confidence) for _SAMPLE_KEYPOINT_NAMES.
+_SAMPLE_KEYPOINT_NAMES = ("NOSE", "LEFT_EYE", "RIGHT_EYE", *IMPORTANT_KEYPOINT_NAMES)
+_SAMPLE_HEAD_ROWS = 3
+
+
+def _sample_keypoints(arms: List[List[float]]) -> np.ndarray:
+    """Sample pose rows: shared head, shoulders and legs around the given arms"""
+    return np.array(
+        [
+            [0.5, 0.2, 1.0],  # NOSE
+            [0.5, 0.25, 1.0],  # LEFT_EYE
+            [0.5, 0.25, 1.0],  # RIGHT_EYE
+            [0.3, 0.4, 1.0],  # LEFT_SHOULDER
+            [0.7, 0.4, 1.0],  # RIGHT_SHOULDER
+            *arms,  # LEFT/RIGHT_ELBOW, LEFT/RIGHT_WRIST
+            [0.4, 0.6, 1.0],  # LEFT_HIP
+            [0.6, 0.6, 1.0],  # RIGHT_HIP
+            [0.4, 0.8, 1.0],  # LEFT_KNEE
+            [0.6, 0.8, 1.0],  # RIGHT_KNEE
+            [0.4, 1.0, 1.0],  # LEFT_ANKLE
+            [0.6, 1.0, 1.0],  # RIGHT_ANKLE
+        ],
+        # float64 so the JSON keeps the literals exactly (0.2, not 0.2000000029)
+        dtype=np.float64,
+    )
+
+
+# (name, keypoints, difficulty, tags, description)
+_SAMPLE_POSES: List[Tuple[str, np.ndarray, str, Tuple[str, ...], str]] = [
+    (
+        "T-Pose",
+        _sample_keypoints(
+            [[0.1, 0.4, 1.0], [0.9, 0.4, 1.0], [0.05, 0.4, 1.0], [0.95, 0.4, 1.0]]
+        ),
+        "easy",
+        ("basic", "calibration"),
+        "Arms extended horizontally, basic pose",
+    ),
+    (
+        "Victory_Pose",
+        _sample_keypoints(
+            [[0.2, 0.3, 1.0], [0.8, 0.3, 1.0], [0.15, 0.15, 1.0], [0.85, 0.15, 1.0]]
+        ),
+        "easy",
+        ("celebration", "arms_up"),
+        "Both arms raised up in victory",
+    ),
+    (
+        "Disco_Point",
+        _sample_keypoints(
+            [[0.25, 0.35, 1.0], [0.9, 0.25, 1.0], [0.2, 0.5, 1.0], [1.0, 0.1, 1.0]]
+        ),
+        "medium",
+        ("disco", "pointing", "dance"),
+        "Classic disco pointing pose",
+    ),
+]
+
+
+def _read_json(path: Path) -> dict:
+    """Parse a JSON file, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _keypoint_array(pose: Pose) -> np.ndarray:
+    """
+    Gather (x, y, confidence) rows for IMPORTANT_KEYPOINT_NAMES
+    Joints missing from the pose get zero confidence. The array is cached on
+    the pose, so each pose is gathered at most once.
+    """
+    if pose.important_keypoints is not None:
+        return pose.important_keypoints
+
+    keypoints = np.zeros((_K, 3), dtype=np.float32)
+    for row, keypoint_name in enumerate(IMPORTANT_KEYPOINT_NAMES):
+        kp = pose.get_keypoint_by_name(keypoint_name)
+        if kp:
+            keypoints[row] = (kp.x, kp.y, kp.confidence)
+    pose.important_keypoints = keypoints
+    return keypoints
+
+
+# Separates tags in the binary pose cache's string arrays
+_TAG_SEPARATOR = "\x1f"
+# Bumped whenever _pose_cache_arrays changes what it stores
+_POSE_CACHE_VERSION = 1
+
+
+def _pose_cache_arrays(dance_poses: List[DancePose]) -> Dict[str, np.ndarray]:
+    """
+    Flatten dance poses into the arrays stored in the binary cache
+    Every pose's keypoints are concatenated into `keypoints`/`keypoint_names`,
+    with pose i owning rows offsets[i]:offsets[i + 1]. Only plain dtypes are
+    used, so loading never needs pickle.
+    """
+    counts = [len(dance_pose.keypoints) for dance_pose in dance_poses]
+    keypoints = [kp for dance_pose in dance_poses for kp in dance_pose.keypoints]
+    important = [_keypoint_array(dance_pose.to_pose()) for dance_pose in dance_poses]
+    return {
+        "version": np.array(_POSE_CACHE_VERSION),
+        # Row layout of `important`; a cache written under other settings is stale
+        "important_names": np.array(IMPORTANT_KEYPOINT_NAMES, dtype=str),
+        "names": np.array([p.name for p in dance_poses], dtype=str),
+        "difficulty": np.array([p.difficulty for p in dance_poses], dtype=str),
+        "tags": np.array([_TAG_SEPARATOR.join(p.tags) for p in dance_poses], dtype=str),
+        "description": np.array([p.description for p in dance_poses], dtype=str),
+        "offsets": np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]),
+        # float64 so values round-trip exactly like the JSON floats
+        "keypoints": np.array(
+            [(kp.x, kp.y, kp.confidence) for kp in keypoints], dtype=np.float64
+        ).reshape(-1, 3),
+        "keypoint_names": np.array([kp.name or "" for kp in keypoints], dtype=str),
+        # Matcher rows, so building the library skips the per-pose gather
+        "important": (
+            np.stack(important) if important else np.zeros((0, _K, 3), np.float32)
+        ),
+    }
+
+
+def _load_pose_cache(path: Path) -> Dict[str, DancePose]:
+    """
+    Rebuild dance poses from a cache written by _pose_cache_arrays
+    Raises ValueError if the cache was written by another version or under
+    different IMPORTANT_KEYPOINT_NAMES, or if its arrays don't line up.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+
+    if "version" not in arrays or int(arrays["version"]) != _POSE_CACHE_VERSION:
+        raise ValueError("unsupported cache version")
+    if arrays["important_names"].tolist() != list(IMPORTANT_KEYPOINT_NAMES):
+        raise ValueError("cache was built for different important keypoints")
+    count = len(arrays["names"])
+    if (
+        arrays["important"].shape != (count, _K, 3)
+        or arrays["offsets"].shape != (count + 1,)
+        or arrays["keypoints"].shape != (int(arrays["offsets"][-1]), 3)
+        or len(arrays["keypoint_names"]) != len(arrays["keypoints"])
+    ):
+        raise ValueError("cache arrays have inconsistent shapes")
+
+    offsets = arrays["offsets"].tolist()
+    rows = arrays["keypoints"].tolist()
+    keypoint_names = arrays["keypoint_names"].tolist()
+    dance_poses = {}
+    for i, name in enumerate(arrays["names"].tolist()):
+        start, end = offsets[i], offsets[i + 1]
+        tags = str(arrays["tags"][i])
+        dance_poses[name] = DancePose(
+            name=name,
+            keypoints=[
+                Keypoint(x, y, confidence, keypoint_name or None)
+                for (x, y, confidence), keypoint_name in zip(
+                    rows[start:end], keypoint_names[start:end]
+                )
+            ],
+            difficulty=str(arrays["difficulty"][i]),
+            tags=tags.split(_TAG_SEPARATOR) if tags else [],
+            description=str(arrays["description"][i]),
+            important_keypoints=arrays["important"][i],
+        )
+    return dance_poses
+
+
+def _normalize_xy(keypoints: np.ndarray) -> np.ndarray:
+    """
+    Centre on the mid-shoulder root and scale the shoulder width to 100 units
+    Works on one (K, 3) pose or a (..., K, 3) stack. Poses whose shoulders
+    aren't confidently visible keep their coordinates unscaled.
+    """
+    xy = keypoints[..., :2]
+    reference = keypoints[..., _NORMALIZATION_ROWS, :]
+    ref_distance = np.linalg.norm(
+        reference[..., 0, :2] - reference[..., 1, :2], axis=-1
+    )
+    usable = (reference[..., 2] >= 0.5).all(axis=-1) & (ref_distance > 0)
+
+    root = np.where(usable[..., None], reference[..., :2].mean(axis=-2), 0.0)
+    scale = np.divide(100.0, ref_distance, out=np.ones_like(ref_distance), where=usable)
+    return ((xy - root[..., None, :]) * scale[..., None, None]).astype(np.float32)
+
+
+def _mirror_keypoints(keypoints: np.ndarray) -> np.ndarray:
+    """
+    Mirror image of a (..., K, 3) pose: swap left/right joints and reflect x
+    about the mid-shoulder line (or the mean x if the shoulders are missing)
+    """
+    reference = keypoints[..., _NORMALIZATION_ROWS, :]
+    axis_x = np.where(
+        (reference[..., 2] >= 0.5).all(axis=-1),
+        reference[..., 0].mean(axis=-1),
+        keypoints[..., 0].mean(axis=-1),
+    )
+
+    mirrored = keypoints[..., _MIRROR_ROWS, :]
+    mirrored[..., 0] = 2 * axis_x[..., None] - mirrored[..., 0]
+    return mirrored
+
+
+def _match_cache_key(xy: np.ndarray, mask: np.ndarray) -> bytes:
+    """Coarse fingerprint of a normalized pose: visible joints snapped to a grid"""
+    grid = np.clip(np.rint(xy / POSE_MATCH_CACHE_QUANTUM), -32768, 32767)
+    grid = np.where(mask[:, None], grid, 0).astype(np.int16)
+    return grid.tobytes() + np.packbits(mask).tobytes()
+
+
+def _joint_angles(keypoints: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Signed joint angles for _ANGLE_JOINTS from (..., K, 3) keypoint rows
+    Returns (angles in radians, valid mask); invariant to scale and shift.
+    """
+    a = keypoints[..., _ANGLE_TRIPLETS[:, 0], :]
+    b = keypoints[..., _ANGLE_TRIPLETS[:, 1], :]
+    c = keypoints[..., _ANGLE_TRIPLETS[:, 2], :]
+
+    ba = a[..., :2] - b[..., :2]
+    bc = c[..., :2] - b[..., :2]
+    cross = ba[..., 0] * bc[..., 1] - ba[..., 1] * bc[..., 0]
+    dot = np.einsum("...d,...d->...", ba, bc)
+
+    valid = (a[..., 2] > 0.5) & (b[..., 2] > 0.5) & (c[..., 2] > 0.5)
+    return np.arctan2(cross, dot).astype(np.float32), valid
 
 
 class DancePoseMatcher:
     """Matches detected poses against predefined dance poses"""
 
-    def __init__(self, poses_file: str = "data/poses/dance_poses.json"):
+    def __init__(
+        self,
+        poses_file: str = "data/poses/dance_poses.json",
+        mirror_invariant: bool = POSE_MATCH_MIRROR_INVARIANT,
+        match_cache_size: int = POSE_MATCH_CACHE_SIZE,
+    ):
         self.poses_file = Path(poses_file)
+        # Binary copy of the poses file, loaded instead of the JSON while newer
+        self.cache_file = self.poses_file.with_suffix(".npz")
+        self._mirror_invariant = mirror_invariant
+        self.match_cache_size = match_cache_size
         self.dance_poses: Dict[str, DancePose] = {}
+
+        # Stacked copy of dance_poses used by match_pose, rebuilt after edits.
+        # With mirror_invariant, rows [P, 2P) hold the mirrored poses, so row
+        # r belongs to pose r % P
+        self._library_names: List[str] = []
+        self._library_xy = np.zeros((0, _K, 2), LIBRARY_DTYPE)
+        self._library_raw_xy = np.zeros((0, _K, 2), np.float32)
+        self._library_mask = np.zeros((0, _K), bool)
+        self._library_angles = np.zeros((0, len(_ANGLE_JOINTS)), np.float32)
+        self._library_angle_mask = np.zeros((0, len(_ANGLE_JOINTS)), bool)
+        self._library_dirty = True
+        self._library_index = None
+        self._names_cache: Optional[Tuple[str, ...]] = None
+        # Recent normalized match results, least recently used first
+        self._match_cache: "OrderedDict[bytes, Optional[PoseMatch]]" = OrderedDict()
+
         self.load_dance_poses()
 
+    @property
+    def mirror_invariant(self) -> bool:
+        """Whether each dance pose also matches its left/right mirror image"""
+        return self._mirror_invariant
+
+    @mirror_invariant.setter
+    def mirror_invariant(self, value: bool) -> None:
+        if value != self._mirror_invariant:
+            self._mirror_invariant = value
+            # The mirrored rows live in the library, and cached results may
+            # have come from them
+            self._library_dirty = True
+            self._match_cache.clear()
+
     def load_dance_poses(self) -> bool:
-        """Load dance poses from JSON file"""
+        """Load dance poses from the binary cache, or else the JSON file"""
         try:
             if not self.poses_file.exists():
                 # Create sample poses if file doesn't exist
                 self._create_sample_poses()
                 return True
 
-            with open(self.poses_file, "r") as f:
-                data = json.load(f)
+            if self._cache_is_fresh():
+                try:
+                    self.dance_poses = _load_pose_cache(self.cache_file)
+                    self._invalidate_caches()
+                    print(f"Loaded {len(self.dance_poses)} dance poses (cached)")
+                    return True
+                except Exception as e:
+                    print(f"Ignoring dance pose cache: {e}")
+
+            data = _read_json(self.poses_file)
 
             self.dance_poses = {}
             for pose_data in data.get("poses", []):
                 dance_pose = DancePose.from_dict(pose_data)
                 self.dance_poses[dance_pose.name] = dance_pose
+            self._invalidate_caches()
+            self._save_npz_cache()
 
             print(f"Loaded {len(self.dance_poses)} dance poses")
             return True
@@ -58,6 +393,7 @@ class DancePoseMatcher:
 
             with open(self.poses_file, "w") as f:
                 json.dump(data, f, indent=2)
+            self._save_npz_cache()
 
             print(f"Saved {len(self.dance_poses)} dance poses")
             return True
@@ -66,6 +402,27 @@ class DancePoseMatcher:
             print(f"Error saving dance poses: {e}")
             return False
 
+    def _cache_is_fresh(self) -> bool:
+        """Whether the binary cache was written after the JSON last changed"""
+        try:
+            return (
+                self.cache_file.stat().st_mtime_ns > self.poses_file.stat().st_mtime_ns
+            )
+        except OSError:
+            return False
+
+    def _save_npz_cache(self) -> None:
+        """Write dance_poses to the binary cache next to the JSON file"""
+        tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        try:
+            with open(tmp_file, "wb") as f:
+                np.savez(f, **_pose_cache_arrays(list(self.dance_poses.values())))
+            # Replace in one step so a crash never leaves a truncated cache
+            tmp_file.replace(self.cache_file)
+        except Exception as e:
+            print(f"Could not write dance pose cache: {e}")
+            tmp_file.unlink(missing_ok=True)
+
     def match_pose(
         self, detected_pose: Pose, normalize: bool = True
     ) -> Optional[PoseMatch]:
@@ -76,72 +433,193 @@ class DancePoseMatcher:
         if not detected_pose or not self.dance_poses:
             return None
 
-        best_match = None
-        best_similarity = 0.0
+        detected = _keypoint_array(detected_pose)
+        detected_mask = detected[:, 2] > 0.5
+        if np.count_nonzero(detected_mask) < POSE_MATCH_MIN_VISIBLE_KEYPOINTS:
+            # Too little of the player is visible for any match to be meaningful
+            return None
+
+        if self._library_dirty:
+            self._build_library()
+
+        detected_xy = _normalize_xy(detected) if normalize else detected[:, :2]
+
+        cache_key = None
+        if normalize and self.match_cache_size > 0:
+            # Consecutive frames of a held pose land on the same key
+            cache_key = _match_cache_key(detected_xy, detected_mask)
+            if cache_key in self._match_cache:
+                self._match_cache.move_to_end(cache_key)
+                return self._match_cache[cache_key]
+
+        pose_match = self._match_arrays(detected_xy, detected_mask, normalize)
 
-        # Normalize the detected pose if requested
-        if normalize:
-            detected_pose = detected_pose.normalize_scale(NORMALIZATION_KEYPOINTS)
+        if cache_key is not None:
+            self._match_cache[cache_key] = pose_match
+            if len(self._match_cache) > self.match_cache_size:
+                self._match_cache.popitem(last=False)
+        return pose_match
 
-        for pose_name, dance_pose in self.dance_poses.items():
-            # Calculate similarity
-            similarity, distance, matched_kps = self._calculate_pose_similarity(
-                detected_pose, dance_pose.to_pose(), normalize
+    def _match_arrays(
+        self, detected_xy: np.ndarray, detected_mask: np.ndarray, normalize: bool
+    ) -> Optional[PoseMatch]:
+        """Best PoseMatch for detected (K, 2) coordinates and visibility mask"""
+        rows = None
+        if self._library_index is not None and normalize and detected_mask.all():
+            # Only score the nearest rows of the (approximate) index exactly
+            labels, _ = self._library_index.knn_query(
+                detected_xy.reshape(1, -1),
+                k=min(POSE_INDEX_CANDIDATES, len(self._library_xy)),
             )
+            rows = labels[0].astype(np.intp)
 
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match = PoseMatch(
-                    pose_name=pose_name,
-                    similarity=similarity,
-                    distance=distance,
-                    matched_keypoints=matched_kps,
-                    total_keypoints=len(IMPORTANT_KEYPOINT_NAMES),
-                    is_good_match=similarity >= POSE_MATCH_THRESHOLD * 0.7,
-                    is_perfect_match=similarity >= POSE_MATCH_THRESHOLD,
-                )
+        distances, matched_kps = self._calculate_pose_distances(
+            detected_xy, detected_mask, normalize, rows
+        )
 
-        return best_match if best_match and best_match.similarity > 0.3 else None
+        # Similarity is monotone in distance, so rank on distance and only
+        # convert the winner (exponential decay, 1 is a perfect match)
+        best = int(np.argmin(distances))
+        best_similarity = math.exp(-float(distances[best]) / MAX_POSE_DISTANCE)
+        if best_similarity <= 0.3:
+            return None
 
-    def _calculate_pose_similarity(
-        self, pose1: Pose, pose2: Pose, normalize: bool = True
-    ) -> Tuple[float, float, int]:
+        library_row = best if rows is None else int(rows[best])
+        return PoseMatch(
+            pose_name=self._library_names[library_row % len(self._library_names)],
+            similarity=best_similarity,
+            distance=float(distances[best]),
+            matched_keypoints=int(matched_kps[best]),
+            total_keypoints=len(IMPORTANT_KEYPOINT_NAMES),
+            is_good_match=best_similarity >= POSE_MATCH_THRESHOLD * 0.7,
+            is_perfect_match=best_similarity >= POSE_MATCH_THRESHOLD,
+        )
+
+    def _calculate_pose_distances(
+        self,
+        detected_xy: np.ndarray,
+        detected_mask: np.ndarray,
+        normalize: bool,
+        rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Calculate similarity between two poses
-        Returns (similarity, distance, matched_keypoints)
+        Calculate the distance from a detected pose to every dance pose
+        (or only the library `rows` given)
+        Returns (distances, matched_keypoints), one entry per pose
         """
-        if normalize:
-            pose2 = pose2.normalize_scale(NORMALIZATION_KEYPOINTS)
-
-        total_distance = 0.0
-        valid_comparisons = 0
-        matched_keypoints = 0
-
-        # Compare semantic joints by name to support both 15-keypoint and 33-keypoint inputs.
-        for keypoint_name in IMPORTANT_KEYPOINT_NAMES:
-            kp1 = pose1.get_keypoint_by_name(keypoint_name)
-            kp2 = pose2.get_keypoint_by_name(keypoint_name)
+        library_xy = self._library_xy if normalize else self._library_raw_xy
+        library_mask = self._library_mask
+        if rows is not None:
+            library_xy = library_xy[rows]
+            library_mask = library_mask[rows]
+
+        # Rows follow IMPORTANT_KEYPOINT_NAMES for 15- and 33-keypoint poses
+        # alike. A keypoint counts as "matched" if within reasonable distance
+        return masked_pose_distances(
+            detected_xy,
+            detected_mask,
+            library_xy,
+            library_mask,
+            MAX_POSE_DISTANCE * 0.3,
+        )
+
+    def match_pose_by_angles(self, detected_pose: Pose) -> Optional[PoseMatch]:
+        """
+        Match a detected pose by its joint angles instead of joint positions
+        Needs no normalization, so it is robust to the player's size and
+        distance from the camera. Returns the best match, or None when too few
+        angles are visible or nothing scores above ANGLE_MATCH_MIN_SIMILARITY.
+        """
+        if not detected_pose or not self.dance_poses:
+            return None
 
-            if kp1 and kp2 and kp1.confidence > 0.5 and kp2.confidence > 0.5:
-                distance = kp1.distance_to(kp2)
-                total_distance += distance
-                valid_comparisons += 1
+        detected_angles, detected_mask = _joint_angles(_keypoint_array(detected_pose))
+        # A couple of visible angles would match some pose near-perfectly
+        if np.count_nonzero(detected_mask) < ANGLE_MATCH_MIN_VALID_ANGLES:
+            return None
 
-                # Consider a keypoint "matched" if within reasonable distance
-                if distance < MAX_POSE_DISTANCE * 0.3:
-                    matched_keypoints += 1
+        if self._library_dirty:
+            self._build_library()
 
-        if valid_comparisons == 0:
-            return 0.0, float("inf"), 0
+        # Wrap differences into [0, pi] so -170 and 170 degrees are close
+        diff = self._library_angles - detected_angles[None]
+        errors = np.abs((diff + np.pi) % (2 * np.pi) - np.pi)
+        valid = self._library_angle_mask & detected_mask[None]
+        valid_angles = valid.sum(axis=1)
+        comparable = valid_angles >= ANGLE_MATCH_MIN_VALID_ANGLES
+        if not comparable.any():
+            return None
 
-        # Calculate average distance
-        avg_distance = total_distance / valid_comparisons
+        mean_error = np.divide(
+            np.where(valid, errors, 0.0).sum(axis=1),
+            valid_angles,
+            out=np.full(valid_angles.shape, np.pi),
+            where=valid_angles > 0,
+        )
+        similarities = np.where(comparable, 1.0 - mean_error / np.pi, -np.inf)
+
+        best = int(np.argmax(similarities))
+        best_similarity = float(similarities[best])
+        if best_similarity < ANGLE_MATCH_MIN_SIMILARITY:
+            return None
 
-        # Convert distance to similarity (0-1, where 1 is perfect match)
-        # Using exponential decay function
-        similarity = np.exp(-avg_distance / MAX_POSE_DISTANCE)
+        return PoseMatch(
+            pose_name=self._library_names[best % len(self._library_names)],
+            similarity=best_similarity,
+            distance=float(mean_error[best]),
+            matched_keypoints=int(
+                (valid[best] & (errors[best] < _ANGLE_MATCH_TOLERANCE)).sum()
+            ),
+            total_keypoints=len(_ANGLE_JOINTS),
+            is_good_match=best_similarity >= ANGLE_MATCH_GOOD_THRESHOLD,
+            is_perfect_match=best_similarity >= ANGLE_MATCH_THRESHOLD,
+        )
+
+    def _invalidate_caches(self) -> None:
+        """Drop everything derived from dance_poses after it changes"""
+        self._library_dirty = True
+        self._names_cache = None
+        self._match_cache.clear()
+
+    def _build_library(self) -> None:
+        """Stack every dance pose into (poses, keypoints) arrays for matching"""
+        self._library_names = list(self.dance_poses.keys())
+
+        arrays = []
+        for dance_pose in self.dance_poses.values():
+            # Gathered once per dance pose; rebuilds after edits only restack
+            if dance_pose.important_keypoints is None:
+                dance_pose.important_keypoints = _keypoint_array(dance_pose.to_pose())
+            arrays.append(dance_pose.important_keypoints)
+        keypoints = np.stack(arrays) if arrays else np.zeros((0, _K, 3), np.float32)
+        if self.mirror_invariant:
+            keypoints = np.concatenate([keypoints, _mirror_keypoints(keypoints)])
+
+        # Raw coordinates stay float32: they can be unnormalized pixel values
+        self._library_raw_xy = np.ascontiguousarray(keypoints[..., :2])
+        self._library_xy = _normalize_xy(keypoints).astype(LIBRARY_DTYPE, copy=False)
+        self._library_mask = keypoints[..., 2] > 0.5
+        self._library_angles, self._library_angle_mask = _joint_angles(keypoints)
+        self._library_index = self._build_index()
+        self._library_dirty = False
+
+    def _build_index(self):
+        """
+        HNSW index over the flattened normalized library, or None when the
+        library is small enough to scan (or hnswlib isn't installed)
+        Hidden joints are indexed at the root; exact scoring of the returned
+        candidates still applies the visibility masks.
+        """
+        num_rows = len(self._library_xy)
+        if hnswlib is None or num_rows < POSE_INDEX_MIN_POSES:
+            return None
 
-        return similarity, avg_distance, matched_keypoints
+        vectors = np.where(self._library_mask[..., None], self._library_xy, 0.0)
+        index = hnswlib.Index(space="l2", dim=_K * 2)
+        index.init_index(max_elements=num_rows, M=16, ef_construction=200)
+        index.add_items(vectors.reshape(num_rows, -1), np.arange(num_rows))
+        index.set_ef(max(50, POSE_INDEX_CANDIDATES))
+        return index
 
     def add_dance_pose(
         self,
@@ -156,12 +634,14 @@ class DancePoseMatcher:
             dance_pose = DancePose(
                 name=name,
                 keypoints=pose.keypoints.copy(),
+                important_keypoints=pose.important_keypoints,
                 difficulty=difficulty,
                 tags=tags or [],
                 description=description,
             )
 
             self.dance_poses[name] = dance_pose
+            self._invalidate_caches()
             return True
 
         except Exception as e:
@@ -172,12 +652,15 @@ class DancePoseMatcher:
         """Remove a dance pose from the collection"""
         if name in self.dance_poses:
             del self.dance_poses[name]
+            self._invalidate_caches()
             return True
         return False
 
-    def get_pose_names(self) -> List[str]:
-        """Get list of all available pose names"""
-        return list(self.dance_poses.keys())
+    def get_pose_names(self) -> Tuple[str, ...]:
+        """Get all available pose names (cached until the library changes)"""
+        if self._names_cache is None:
+            self._names_cache = tuple(self.dance_poses.keys())
+        return self._names_cache
 
     def get_poses_by_difficulty(self, difficulty: str) -> List[str]:
         """Get pose names filtered by difficulty"""
@@ -192,84 +675,24 @@ class DancePoseMatcher:
         # Create the directory if it doesn't exist
         self.poses_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # Sample poses with normalized coordinates (0-1 range)
-        sample_poses = {
-            "T-Pose": {
-                "name": "T-Pose",
-                "keypoints": [
-                    {"x": 0.5, "y": 0.2, "confidence": 1.0, "name": "NOSE"},
-                    {"x": 0.5, "y": 0.25, "confidence": 1.0, "name": "LEFT_EYE"},
-                    {"x": 0.5, "y": 0.25, "confidence": 1.0, "name": "RIGHT_EYE"},
-                    {"x": 0.3, "y": 0.4, "confidence": 1.0, "name": "LEFT_SHOULDER"},
-                    {"x": 0.7, "y": 0.4, "confidence": 1.0, "name": "RIGHT_SHOULDER"},
-                    {"x": 0.1, "y": 0.4, "confidence": 1.0, "name": "LEFT_ELBOW"},
-                    {"x": 0.9, "y": 0.4, "confidence": 1.0, "name": "RIGHT_ELBOW"},
-                    {"x": 0.05, "y": 0.4, "confidence": 1.0, "name": "LEFT_WRIST"},
-                    {"x": 0.95, "y": 0.4, "confidence": 1.0, "name": "RIGHT_WRIST"},
-                    {"x": 0.4, "y": 0.6, "confidence": 1.0, "name": "LEFT_HIP"},
-                    {"x": 0.6, "y": 0.6, "confidence": 1.0, "name": "RIGHT_HIP"},
-                    {"x": 0.4, "y": 0.8, "confidence": 1.0, "name": "LEFT_KNEE"},
-                    {"x": 0.6, "y": 0.8, "confidence": 1.0, "name": "RIGHT_KNEE"},
-                    {"x": 0.4, "y": 1.0, "confidence": 1.0, "name": "LEFT_ANKLE"},
-                    {"x": 0.6, "y": 1.0, "confidence": 1.0, "name": "RIGHT_ANKLE"},
-                ],
-                "difficulty": "easy",
-                "tags": ["basic", "calibration"],
-                "description": "Arms extended horizontally, basic pose",
-            },
-            "Victory_Pose": {
-                "name": "Victory_Pose",
-                "keypoints": [
-                    {"x": 0.5, "y": 0.2, "confidence": 1.0, "name": "NOSE"},
-                    {"x": 0.5, "y": 0.25, "confidence": 1.0, "name": "LEFT_EYE"},
-                    {"x": 0.5, "y": 0.25, "confidence": 1.0, "name": "RIGHT_EYE"},
-                    {"x": 0.3, "y": 0.4, "confidence": 1.0, "name": "LEFT_SHOULDER"},
-                    {"x": 0.7, "y": 0.4, "confidence": 1.0, "name": "RIGHT_SHOULDER"},
-                    {"x": 0.2, "y": 0.3, "confidence": 1.0, "name": "LEFT_ELBOW"},
-                    {"x": 0.8, "y": 0.3, "confidence": 1.0, "name": "RIGHT_ELBOW"},
-                    {"x": 0.15, "y": 0.15, "confidence": 1.0, "name": "LEFT_WRIST"},
-                    {"x": 0.85, "y": 0.15, "confidence": 1.0, "name": "RIGHT_WRIST"},
-                    {"x": 0.4, "y": 0.6, "confidence": 1.0, "name": "LEFT_HIP"},
-                    {"x": 0.6, "y": 0.6, "confidence": 1.0, "name": "RIGHT_HIP"},
-                    {"x": 0.4, "y": 0.8, "confidence": 1.0, "name": "LEFT_KNEE"},
-                    {"x": 0.6, "y": 0.8, "confidence": 1.0, "name": "RIGHT_KNEE"},
-                    {"x": 0.4, "y": 1.0, "confidence": 1.0, "name": "LEFT_ANKLE"},
-                    {"x": 0.6, "y": 1.0, "confidence": 1.0, "name": "RIGHT_ANKLE"},
-                ],
-                "difficulty": "easy",
-                "tags": ["celebration", "arms_up"],
-                "description": "Both arms raised up in victory",
-            },
-            "Disco_Point": {
-                "name": "Disco_Point",
-                "keypoints": [
-                    {"x": 0.5, "y": 0.2, "confidence": 1.0, "name": "NOSE"},
-                    {"x": 0.5, "y": 0.25, "confidence": 1.0, "name": "LEFT_EYE"},
-                    {"x": 0.5, "y": 0.25, "confidence": 1.0, "name": "RIGHT_EYE"},
-                    {"x": 0.3, "y": 0.4, "confidence": 1.0, "name": "LEFT_SHOULDER"},
-                    {"x": 0.7, "y": 0.4, "confidence": 1.0, "name": "RIGHT_SHOULDER"},
-                    {"x": 0.25, "y": 0.35, "confidence": 1.0, "name": "LEFT_ELBOW"},
-                    {"x": 0.9, "y": 0.25, "confidence": 1.0, "name": "RIGHT_ELBOW"},
-                    {"x": 0.2, "y": 0.5, "confidence": 1.0, "name": "LEFT_WRIST"},
-                    {"x": 1.0, "y": 0.1, "confidence": 1.0, "name": "RIGHT_WRIST"},
-                    {"x": 0.4, "y": 0.6, "confidence": 1.0, "name": "LEFT_HIP"},
-                    {"x": 0.6, "y": 0.6, "confidence": 1.0, "name": "RIGHT_HIP"},
-                    {"x": 0.4, "y": 0.8, "confidence": 1.0, "name": "LEFT_KNEE"},
-                    {"x": 0.6, "y": 0.8, "confidence": 1.0, "name": "RIGHT_KNEE"},
-                    {"x": 0.4, "y": 1.0, "confidence": 1.0, "name": "LEFT_ANKLE"},
-                    {"x": 0.6, "y": 1.0, "confidence": 1.0, "name": "RIGHT_ANKLE"},
+        self.dance_poses = {}
+        for name, keypoints, difficulty, tags, description in _SAMPLE_POSES:
+            self.dance_poses[name] = DancePose(
+                name=name,
+                keypoints=[
+                    Keypoint(x, y, confidence, keypoint_name)
+                    for keypoint_name, (x, y, confidence) in zip(
+                        _SAMPLE_KEYPOINT_NAMES, keypoints.tolist()
+                    )
                 ],
-                "difficulty": "medium",
-                "tags": ["disco", "pointing", "dance"],
-                "description": "Classic disco pointing pose",
-            },
-        }
-
-        # Convert to our format and save
-        for pose_name, pose_data in sample_poses.items():
-            dance_pose = DancePose.from_dict(pose_data)
-            self.dance_poses[pose_name] = dance_pose
+                difficulty=difficulty,
+                tags=list(tags),
+                description=description,
+                # Rows after the head are already in IMPORTANT_KEYPOINT_NAMES order
+                important_keypoints=keypoints[_SAMPLE_HEAD_ROWS:].astype(np.float32),
+            )
+        self._invalidate_caches()
 
         # Save to file
         self.save_dance_poses()
-        print(f"Created {len(sample_poses)} sample dance poses")
+        print(f"Created {len(_SAMPLE_POSES)} sample dance poses")
@@ -1,10 +1,24 @@
-from dataclasses import dataclass
-from typing import Optional, Tuple, Union
+import math
+from dataclasses import dataclass, field
+from typing import Optional, Sequence, Tuple, Union
 
 import numpy as np
 
+from config.settings import KEYPOINT_INDICES
 
-@dataclass
+
+def mirrored_keypoint_name(name: str) -> str:
+    """Name of the left/right counterpart (LEFT_* <-> RIGHT_*), else the name itself"""
+    if name.startswith("LEFT_"):
+        return "RIGHT_" + name[len("LEFT_") :]
+    if name.startswith("RIGHT_"):
+        return "LEFT_" + name[len("RIGHT_") :]
+    return name
+
+
+# Slotted: 33 keypoints are built per frame. Not frozen, since frozen
+# dataclasses construct roughly 3x slower.
+@dataclass(slots=True)
 class Keypoint:
     """Represents a single keypoint/joint in 2D space"""
 
@@ -19,17 +33,112 @@ class Keypoint:
 
     def distance_to(self, other: "Keypoint") -> float:
         """Calculate Euclidean distance to another keypoint"""
-        return np.sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2)
+        return math.hypot(self.x - other.x, self.y - other.y)
 
 
-@dataclass
+@dataclass(slots=True, init=False, eq=False)
 class Pose:
-    """Represents a complete pose with all keypoints"""
+    """
+    Represents a complete pose with all keypoints
+    Built from Keypoint objects, or from an (N, 3) keypoint_array plus
+    keypoint_names, in which case the Keypoint list is only created on access.
+    """
 
-    keypoints: list[Keypoint]
     confidence: float
-    person_id: Optional[int] = None
-    timestamp: Optional[float] = None
+    person_id: Optional[int]
+    timestamp: Optional[float]
+    # Optional (x, y, confidence) rows for IMPORTANT_KEYPOINT_NAMES, filled in by
+    # producers that already hold the keypoints as an array
+    important_keypoints: Optional[np.ndarray] = field(repr=False)
+    # (N, 3) float32 (x, y, confidence) rows for all keypoints; built lazily by
+    # to_array() unless the producer supplies it
+    keypoint_array: Optional[np.ndarray] = field(repr=False)
+    keypoint_names: Optional[Sequence[str]] = field(repr=False)
+    _keypoints: Optional[list[Keypoint]] = field(repr=False)
+    # (keypoint_array, int32 points) as last computed by to_points
+    _points: Optional[Tuple[np.ndarray, np.ndarray]] = field(repr=False)
+
+    def __init__(
+        self,
+        keypoints: Optional[list[Keypoint]] = None,
+        confidence: float = 0.0,
+        person_id: Optional[int] = None,
+        timestamp: Optional[float] = None,
+        important_keypoints: Optional[np.ndarray] = None,
+        keypoint_array: Optional[np.ndarray] = None,
+        keypoint_names: Optional[Sequence[str]] = None,
+    ):
+        if keypoints is None and keypoint_array is None:
+            keypoints = []
+        self._keypoints = keypoints
+        self.confidence = confidence
+        self.person_id = person_id
+        self.timestamp = timestamp
+        self.important_keypoints = important_keypoints
+        self.keypoint_array = keypoint_array
+        self.keypoint_names = keypoint_names
+        self._points = None
+
+    @property
+    def keypoints(self) -> list[Keypoint]:
+        """Keypoint objects, built from keypoint_array on first access"""
+        if self._keypoints is None:
+            names = self.keypoint_names or ()
+            self._keypoints = [
+                Keypoint(x, y, confidence, names[idx] if idx < len(names) else None)
+                for idx, (x, y, confidence) in enumerate(self.keypoint_array.tolist())
+            ]
+        return self._keypoints
+
+    @keypoints.setter
+    def keypoints(self, keypoints: list[Keypoint]) -> None:
+        """
+        Replace the keypoints and drop every array derived from them
+        Keypoints edited in place aren't tracked; reassign the list afterwards
+        so keypoint_array and the matcher rows are rebuilt.
+        """
+        self._keypoints = keypoints
+        self.keypoint_array = None
+        self.keypoint_names = None
+        self.important_keypoints = None
+        self._points = None
+
+    def __repr__(self) -> str:
+        return (
+            f"Pose(keypoints={self.keypoints!r}, confidence={self.confidence!r}, "
+            f"person_id={self.person_id!r}, timestamp={self.timestamp!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Pose):
+            return NotImplemented
+        return (self.keypoints, self.confidence, self.person_id, self.timestamp) == (
+            other.keypoints,
+            other.confidence,
+            other.person_id,
+            other.timestamp,
+        )
+
+    def to_array(self) -> np.ndarray:
+        """Keypoints as an (N, 3) float32 array of (x, y, confidence), cached"""
+        if self.keypoint_array is None:
+            self.keypoint_array = np.array(
+                [(kp.x, kp.y, kp.confidence) for kp in self.keypoints],
+                dtype=np.float32,
+            ).reshape(-1, 3)
+        return self.keypoint_array
+
+    def to_points(self) -> np.ndarray:
+        """
+        Keypoint positions as (N, 2) int32 pixel coordinates, cached
+        Array form of Keypoint.to_tuple for drawing several keypoints at once.
+        The cache follows keypoint_array, so assigning a new array invalidates
+        it; edit keypoint_array in place only before the first call.
+        """
+        keypoints = self.to_array()
+        if self._points is None or self._points[0] is not keypoints:
+            self._points = (keypoints, keypoints[:, :2].astype(np.int32))
+        return self._points[1]
 
     def get_keypoint(self, index: int) -> Optional[Keypoint]:
         """Get keypoint by index, return None if invalid"""
@@ -39,34 +148,48 @@ class Pose:
 
     def get_keypoint_by_name(self, name: str) -> Optional[Keypoint]:
         """Get keypoint by name, return None if not found"""
-        for kp in self.keypoints:
+        idx = self._index_of_name(name)
+        return None if idx is None else self.keypoints[idx]
+
+    def _index_of_name(self, name: str) -> Optional[int]:
+        """
+        Index of the keypoint called `name`
+        Poses in MediaPipe landmark order are resolved through KEYPOINT_INDICES;
+        other layouts (e.g. the 15-joint dance poses) fall back to a scan.
+        """
+        keypoints = self.keypoints
+        idx = KEYPOINT_INDICES.get(name)
+        if idx is not None and idx < len(keypoints) and keypoints[idx].name == name:
+            return idx
+        for idx, kp in enumerate(keypoints):
             if kp.name == name:
-                return kp
+                return idx
         return None
 
-    def _resolve_reference_keypoint(
+    def _resolve_reference_index(
         self, reference_keypoint: Union[int, str]
-    ) -> Optional[Keypoint]:
-        """Resolve keypoints from either numeric indices or semantic names."""
+    ) -> Optional[int]:
+        """Resolve a numeric index or semantic name to a keypoint index."""
         if isinstance(reference_keypoint, int):
-            return self.get_keypoint(reference_keypoint)
+            if 0 <= reference_keypoint < len(self.keypoints):
+                return reference_keypoint
+            return None
 
         if isinstance(reference_keypoint, str):
-            return self.get_keypoint_by_name(reference_keypoint)
+            return self._index_of_name(reference_keypoint)
 
         return None
 
     def get_bounding_box(self) -> Tuple[int, int, int, int]:
         """Get bounding box (x, y, width, height) of all visible keypoints"""
-        visible_kps = [kp for kp in self.keypoints if kp.confidence > 0.5]
-        if not visible_kps:
+        keypoints = self.to_array()
+        visible = keypoints[:, 2] > 0.5
+        if not visible.any():
             return (0, 0, 0, 0)
 
-        xs = [kp.x for kp in visible_kps]
-        ys = [kp.y for kp in visible_kps]
-
-        min_x, max_x = min(xs), max(xs)
-        min_y, max_y = min(ys), max(ys)
+        visible_xy = keypoints[visible, :2]
+        min_x, min_y = visible_xy.min(axis=0).tolist()
+        max_x, max_y = visible_xy.max(axis=0).tolist()
 
         return (int(min_x), int(min_y), int(max_x - min_x), int(max_y - min_y))
 
@@ -78,38 +201,61 @@ class Pose:
         if len(reference_keypoints) < 2:
             return self
 
-        # Calculate reference distance (e.g., shoulder width)
-        kp1 = self._resolve_reference_keypoint(reference_keypoints[0])
-        kp2 = self._resolve_reference_keypoint(reference_keypoints[1])
-
-        if not kp1 or not kp2 or kp1.confidence < 0.5 or kp2.confidence < 0.5:
+        reference_rows = [
+            self._resolve_reference_index(reference_keypoint)
+            for reference_keypoint in reference_keypoints[:2]
+        ]
+        if None in reference_rows:
             return self
 
-        ref_distance = kp1.distance_to(kp2)
-        if ref_distance == 0:
-            return self
-
-        # Normalize all keypoints - 100 units
-        scale_factor = 100.0 / ref_distance
-        visible_keypoints = [kp for kp in self.keypoints if kp.confidence > 0.5]
-        if not visible_keypoints:
+        keypoints = self.to_array()
+        normalized = self._normalize_scale_array(keypoints, reference_rows)
+        if normalized is keypoints:
             return self
 
-        center_x = np.mean([kp.x for kp in visible_keypoints])
-        center_y = np.mean([kp.y for kp in visible_keypoints])
+        return Pose(
+            confidence=self.confidence,
+            person_id=self.person_id,
+            timestamp=self.timestamp,
+            keypoint_array=normalized,
+            keypoint_names=[kp.name for kp in self.keypoints],
+        )
 
-        normalized_keypoints = []
-        for kp in self.keypoints:
-            new_x = (kp.x - center_x) * scale_factor + center_x
-            new_y = (kp.y - center_y) * scale_factor + center_y
-            normalized_keypoints.append(Keypoint(new_x, new_y, kp.confidence, kp.name))
+    @staticmethod
+    def _normalize_scale_array(
+        keypoints: np.ndarray, reference_rows: Sequence[int]
+    ) -> np.ndarray:
+        """
+        Array form of normalize_scale for (N, 3) (x, y, confidence) rows
+        Scales about the centre of the visible keypoints so the two reference
+        rows end up 100 units apart. Returns a new array, or `keypoints`
+        itself when the reference rows can't be used.
+        """
+        reference = keypoints[list(reference_rows[:2])]
+        if len(reference) < 2 or (reference[:, 2] < 0.5).any():
+            return keypoints
 
-        return Pose(
-            normalized_keypoints, self.confidence, self.person_id, self.timestamp
+        # Calculate reference distance (e.g., shoulder width)
+        ref_distance = math.hypot(
+            reference[0, 0] - reference[1, 0], reference[0, 1] - reference[1, 1]
         )
+        if ref_distance == 0:
+            return keypoints
 
+        visible = keypoints[:, 2] > 0.5
+        if not visible.any():
+            return keypoints
 
-@dataclass
+        # Normalize all keypoints - 100 units
+        center = keypoints[visible, :2].mean(axis=0)
+        normalized = keypoints.copy()
+        normalized[:, :2] = (keypoints[:, :2] - center) * (
+            100.0 / ref_distance
+        ) + center
+        return normalized
+
+
+@dataclass(slots=True, frozen=True)
 class PoseMatch:
     """Represents the result of matching a pose against a target"""
 
@@ -134,7 +280,7 @@ class PoseMatch:
         return self.matched_keypoints / self.total_keypoints
 
 
-@dataclass
+@dataclass(slots=True)
 class DancePose:
     """Represents a predefined dance pose"""
 
@@ -143,6 +289,10 @@ class DancePose:
     difficulty: str = "medium"
     tags: list[str] = None
     description: str = ""
+    # Cached (x, y, confidence) rows for IMPORTANT_KEYPOINT_NAMES, see Pose
+    important_keypoints: Optional[np.ndarray] = field(
+        default=None, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.tags is None:
@@ -150,7 +300,9 @@ class DancePose:
 
     def to_pose(self) -> Pose:
         """Convert to regular Pose object"""
-        return Pose(self.keypoints.copy(), 1.0)
+        return Pose(
+            self.keypoints.copy(), 1.0, important_keypoints=self.important_keypoints
+        )
 
     @classmethod
     def from_dict(cls, data: dict) -> "DancePose":
@@ -195,10 +347,35 @@ class GameState:
     current_pose: Optional[Pose] = None
     target_pose: Optional[DancePose] = None
     current_match: Optional[PoseMatch] = None
-    score: float = 0.0
     combo_count: int = 0
     is_playing: bool = False
     frame_count: int = 0
     start_time: Optional[float] = None
     last_score_earned: float = 0.0
     last_judgement: Optional[str] = None
+
+    # Score decays continuously and is evaluated on read rather than per frame:
+    # score(now) = score_base * exp(score_log_decay * (now - score_time)).
+    # score_time is a time.monotonic() timestamp; None freezes the score.
+    score_base: float = 0.0
+    score_time: Optional[float] = None
+    score_log_decay: float = 0.0
+
+    def score_at(self, now: float) -> float:
+        """Decayed score at the monotonic timestamp `now`"""
+        if self.score_time is None:
+            return self.score_base
+        return self.score_base * math.exp(
+            self.score_log_decay * (now - self.score_time)
+        )
+
+    def add_score(self, points: float, now: float) -> None:
+        """Add points, rebasing the decay at `now`"""
+        self.score_base = self.score_at(now) + points
+        if self.score_time is not None:
+            self.score_time = now
+
+    def freeze_score(self, now: float) -> None:
+        """Stop decaying, keeping the score as of `now`"""
+        self.score_base = self.score_at(now)
+        self.score_time = None
@@ -1,18 +1,34 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from typing import List, Optional
 
 import cv2
 import mediapipe as mp
 import numpy as np
 from config.settings import (
+    IMPORTANT_KEYPOINTS_ARR,
+    KEYPOINT_INDICES,
     KEYPOINT_NAMES,
+    POSE_FRAME_SKIP,
     POSE_INFERENCE_HEIGHT,
     POSE_INFERENCE_WIDTH,
     POSE_MIN_DETECTION_CONFIDENCE,
     POSE_MIN_TRACKING_CONFIDENCE,
+    POSE_MODEL_COMPLEXITY,
     TARGET_FPS,
 )
 
-from .models import Keypoint, Pose
+from .models import Pose, mirrored_keypoint_name
+
+_KEYPOINT_NAME_LIST = tuple(KEYPOINT_NAMES[idx] for idx in range(len(KEYPOINT_NAMES)))
+
+# Landmark order after a horizontal flip: each joint swaps with its counterpart
+_MIRROR_ORDER = np.asarray(
+    [
+        KEYPOINT_INDICES[mirrored_keypoint_name(KEYPOINT_NAMES[idx])]
+        for idx in range(len(KEYPOINT_NAMES))
+    ],
+    dtype=np.int32,
+)
 
 
 class PoseTracker:
@@ -23,12 +39,16 @@ class PoseTracker:
         min_detection_confidence: float = POSE_MIN_DETECTION_CONFIDENCE,
         min_tracking_confidence: float = POSE_MIN_TRACKING_CONFIDENCE,
         enable_segmentation: bool = False,
+        mirror: bool = False,
+        model_complexity: int = POSE_MODEL_COMPLEXITY,
+        frame_skip: int = POSE_FRAME_SKIP,
+        async_inference: bool = False,
     ):
         self.mp_pose = mp.solutions.pose
         self.pose = self.mp_pose.Pose(
             static_image_mode=False,
             # 0=Lite, 1=Full, 2=Heavy
-            model_complexity=1,
+            model_complexity=model_complexity,
             smooth_landmarks=True,
             enable_segmentation=enable_segmentation,
             smooth_segmentation=True,
@@ -36,75 +56,179 @@ class PoseTracker:
             min_tracking_confidence=min_tracking_confidence,
         )
 
+        # Report keypoints as seen in a horizontally flipped (selfie) view of
+        # the input, so frames never have to be flipped before inference
+        self.mirror = mirror
+
         self.inference_width = POSE_INFERENCE_WIDTH
         self.inference_height = POSE_INFERENCE_HEIGHT
+        # Reused resize/convert buffers for frames without an inference copy
+        self._resized = np.empty(
+            (self.inference_height, self.inference_width, 3), dtype=np.uint8
+        )
+        self._rgb = np.empty_like(self._resized)
         self.frame_count = 0
 
-    def process_frame(self, frame: np.ndarray) -> List[Pose]:
+        # Run inference on every (frame_skip + 1)th frame only
+        self.frame_skip = max(0, frame_skip)
+        self._last_pose: Optional[Pose] = None
+
+        # With async_inference, MediaPipe runs on a worker thread (it releases
+        # the GIL) and process_frame returns the latest finished pose, so
+        # capture and rendering overlap with inference
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="pose")
+            if async_inference
+            else None
+        )
+        self._pending: Optional[Future] = None
+
+    def process_frame(
+        self, frame: np.ndarray, inference_frame: Optional[np.ndarray] = None
+    ) -> List[Pose]:
         """
         Process a frame and extract poses
+        `inference_frame` is an optional downscaled uint8 RGB copy of `frame`
+        (e.g. from CameraSource.read_inference_frame); without it the frame is
+        resized and converted here.
+        In async mode the poses come from the most recent inference that has
+        finished, which may be a frame or two old.
         Returns list of detected poses (currently limited to 1 person)
         """
         if frame is None:
             return []
 
         self.frame_count += 1
+        if self._pending is not None and self._pending.done():
+            self._collect_pending()
+
+        skip_frame = (self.frame_count - 1) % (self.frame_skip + 1)
+        if skip_frame or self._pending is not None:
+            # Skipped frame (the player barely moves between frames), or the
+            # worker is still busy and owns the preprocessing buffers
+            return [self._last_pose] if self._last_pose else []
+
         original_height, original_width = frame.shape[:2]
 
-        # My computer could die
-        inference_frame = cv2.resize(
-            frame, (self.inference_width, self.inference_height)
-        )
+        if inference_frame is not None:
+            rgb_frame = inference_frame
+        else:
+            # My computer could die
+            cv2.resize(
+                frame,
+                (self.inference_width, self.inference_height),
+                dst=self._resized,
+                interpolation=cv2.INTER_AREA,
+            )
 
-        # BGR - > RGB for MP
-        rgb_frame = cv2.cvtColor(inference_frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(rgb_frame)
+            # BGR - > RGB for MP
+            rgb_frame = cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._rgb)
+
+        # MediaPipe takes uint8 RGB directly; frames stay 8-bit all the way
+        # from capture, and only the matcher's keypoint math uses float32.
+        # Camera inference frames are already contiguous, so this is a no-op
+        # unless a caller hands in a sliced view.
+        rgb_frame = np.ascontiguousarray(rgb_frame)
 
-        poses = []
-        if results.pose_landmarks:
-            # MP 33 kps to Poses
-            pose = self._landmarks_to_pose(
-                results.pose_landmarks, original_width, original_height
+        if self._executor is None:
+            self._last_pose = self._infer(
+                rgb_frame, original_width, original_height, self.frame_count
+            )
+        else:
+            self._pending = self._executor.submit(
+                self._infer,
+                rgb_frame,
+                original_width,
+                original_height,
+                self.frame_count,
             )
-            if pose:
-                poses.append(pose)
 
-        return poses
+        return [self._last_pose] if self._last_pose else []
 
-    def _landmarks_to_pose(
-        self, landmarks, original_width: int, original_height: int
+    def _infer(
+        self,
+        rgb_frame: np.ndarray,
+        original_width: int,
+        original_height: int,
+        frame_index: int,
     ) -> Optional[Pose]:
-        """Convert MediaPipe landmarks to our Pose format"""
-        keypoints = []
-        total_confidence = 0.0
-        valid_keypoints = 0
+        """Run MediaPipe on one RGB inference frame"""
+        results = self.pose.process(rgb_frame)
+        if not results.pose_landmarks:
+            return None
 
-        for idx, landmark in enumerate(landmarks.landmark):
-            # Scale coors to frame size
-            x = landmark.x * original_width
-            y = landmark.y * original_height
-            confidence = landmark.visibility if hasattr(landmark, "visibility") else 1.0
+        # MP 33 kps to Poses
+        return self._landmarks_to_pose(
+            results.pose_landmarks, original_width, original_height, frame_index
+        )
 
-            name = KEYPOINT_NAMES.get(idx, f"KEYPOINT_{idx}")
-            keypoint = Keypoint(x=x, y=y, confidence=confidence, name=name)
-            keypoints.append(keypoint)
+    def _collect_pending(self) -> None:
+        """Take the result of the finished background inference"""
+        pending, self._pending = self._pending, None
+        try:
+            self._last_pose = pending.result()
+        except Exception as e:
+            print(f"Pose inference failed: {e}")
+            self._last_pose = None
 
-            if confidence > 0.5:  # Count as valid if confidence > 0.5
-                total_confidence += confidence
-                valid_keypoints += 1
+    def _landmarks_to_pose(
+        self,
+        landmarks,
+        original_width: int,
+        original_height: int,
+        frame_index: Optional[int] = None,
+    ) -> Optional[Pose]:
+        """Convert MediaPipe landmarks to our Pose format"""
+        # Stack all landmarks once; keypoints and the matcher input both read it.
+        # Every landmark has the same fields, so visibility is checked once
+        landmark_list = landmarks.landmark
+        if len(landmark_list) and hasattr(landmark_list[0], "visibility"):
+            rows = [(lm.x, lm.y, lm.visibility) for lm in landmark_list]
+        else:
+            rows = [(lm.x, lm.y, 1.0) for lm in landmark_list]
+        landmark_array = np.array(rows, dtype=np.float32).reshape(-1, 3)
+        if self.mirror and len(landmark_array) == len(KEYPOINT_NAMES):
+            # Same labels and positions MediaPipe reports for a flipped frame
+            landmark_array = landmark_array[_MIRROR_ORDER]
+            landmark_array[:, 0] = 1.0 - landmark_array[:, 0]
+
+        # Scale coors to frame size
+        landmark_array[:, 0] *= original_width
+        landmark_array[:, 1] *= original_height
 
-        if valid_keypoints == 0:
+        # Count as valid if confidence > 0.5
+        confidences = landmark_array[:, 2]
+        valid = confidences > 0.5
+        if not valid.any():
             return None
 
         # Calculate overall pose confidence
-        pose_confidence = total_confidence / len(keypoints)
+        pose_confidence = float(confidences[valid].sum(dtype=np.float64)) / len(
+            landmark_array
+        )
+        if frame_index is None:
+            frame_index = self.frame_count
 
+        # Keypoint objects are only built if something asks for pose.keypoints
         return Pose(
-            keypoints=keypoints,
             confidence=pose_confidence,
             # TODO - will need to track multiple people
             person_id=0,
-            timestamp=self.frame_count / float(TARGET_FPS),
+            timestamp=frame_index / float(TARGET_FPS),
+            keypoint_array=landmark_array,
+            keypoint_names=(
+                _KEYPOINT_NAME_LIST
+                if len(landmark_array) == len(_KEYPOINT_NAME_LIST)
+                else [
+                    KEYPOINT_NAMES.get(idx, f"KEYPOINT_{idx}")
+                    for idx in range(len(landmark_array))
+                ]
+            ),
+            important_keypoints=(
+                landmark_array[IMPORTANT_KEYPOINTS_ARR]
+                if len(landmark_array) == len(KEYPOINT_NAMES)
+                else None
+            ),
         )
 
     def get_pose_world_coordinates(self, frame: np.ndarray) -> Optional[Pose]:
@@ -117,10 +241,20 @@ class PoseTracker:
 
     def reset(self) -> None:
         """Reset the pose tracker state"""
+        if self._pending is not None:
+            # Wait out an in-flight inference and drop its (pre-reset) pose
+            wait([self._pending])
+            self._pending = None
         self.frame_count = 0
+        self._last_pose = None
 
     def close(self) -> None:
         """Clean up resources"""
+        if self._executor is not None:
+            # Let an in-flight inference finish before closing the graph
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._pending = None
         if self.pose:
             self.pose.close()
 
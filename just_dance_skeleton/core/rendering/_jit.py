@@ -0,0 +1,105 @@
+"""
+Overlay geometry kernels
+Compiled with Numba when it is installed, otherwise plain NumPy equivalents.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    NUMBA_AVAILABLE = False
+
+
+def drawable_points(
+    points: np.ndarray, confidences: np.ndarray, frame_shape: Tuple[int, ...]
+) -> np.ndarray:
+    """Mask of keypoints that are confident (> 0.5) and within frame bounds"""
+    height, width = frame_shape[:2]
+    return (
+        (confidences > 0.5)
+        & (points[:, 0] >= 0)
+        & (points[:, 0] < width)
+        & (points[:, 1] >= 0)
+        & (points[:, 1] < height)
+    )
+
+
+def drawable_segments(
+    points: np.ndarray,
+    confidences: np.ndarray,
+    connections: np.ndarray,
+    frame_shape: Tuple[int, ...],
+) -> np.ndarray:
+    """
+    (S, 2, 2) int32 start/end points of the (C, 2) connections worth drawing
+    A connection is drawn only if both keypoints are confident (> 0.5) and
+    within frame bounds.
+    """
+    drawable = drawable_points(points, confidences, frame_shape)
+    connections = connections[(connections < len(points)).all(axis=1)]
+    connections = connections[drawable[connections[:, 0]] & drawable[connections[:, 1]]]
+    return points[connections]
+
+
+def _target_segments_numpy(
+    keypoints: np.ndarray,
+    connections: np.ndarray,
+    transform: np.ndarray,
+    width: int,
+    height: int,
+) -> np.ndarray:
+    """
+    Drawable segments of a target pose mapped onto the screen
+    Each keypoint (x, y) maps through the (2, 3) affine `transform` to
+    (t00 x + t01 y + t02, t10 x + t11 y + t12), truncated to int32.
+    Returns (S, 2, 2) like drawable_segments.
+    """
+    x = keypoints[:, 0].astype(np.float64)
+    y = keypoints[:, 1].astype(np.float64)
+    points = np.empty((len(keypoints), 2), dtype=np.int32)
+    points[:, 0] = x * transform[0, 0] + y * transform[0, 1] + transform[0, 2]
+    points[:, 1] = x * transform[1, 0] + y * transform[1, 1] + transform[1, 2]
+    return drawable_segments(points, keypoints[:, 2], connections, (height, width))
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _target_segments_numba(keypoints, connections, transform, width, height):
+        segments = np.empty((connections.shape[0], 2, 2), dtype=np.int32)
+        num_keypoints = keypoints.shape[0]
+        n = 0
+        for i in range(connections.shape[0]):
+            a, b = connections[i, 0], connections[i, 1]
+            if a >= num_keypoints or b >= num_keypoints:
+                continue
+            if not (keypoints[a, 2] > 0.5 and keypoints[b, 2] > 0.5):
+                continue
+            for end, k in enumerate((a, b)):
+                x = np.float64(keypoints[k, 0])
+                y = np.float64(keypoints[k, 1])
+                segments[n, end, 0] = int(
+                    x * transform[0, 0] + y * transform[0, 1] + transform[0, 2]
+                )
+                segments[n, end, 1] = int(
+                    x * transform[1, 0] + y * transform[1, 1] + transform[1, 2]
+                )
+            ax, ay = segments[n, 0, 0], segments[n, 0, 1]
+            bx, by = segments[n, 1, 0], segments[n, 1, 1]
+            if (
+                0 <= ax < width
+                and 0 <= bx < width
+                and 0 <= ay < height
+                and 0 <= by < height
+            ):
+                n += 1
+        return segments[:n]
+
+    target_segments = _target_segments_numba
+else:
+    target_segments = _target_segments_numpy
@@ -0,0 +1,120 @@
+from typing import Callable, Hashable, List, Tuple
+
+import numpy as np
+
+
+def _draw_over_black_and_white(
+    shape: Tuple[int, ...], dtype: np.dtype, draw: Callable[[np.ndarray], object]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Run `draw` on a black and on a white image of the given shape"""
+    over_black = np.zeros(shape, dtype)
+    draw(over_black)
+    over_white = np.full(shape, 255, dtype)
+    draw(over_white)
+    return over_black, over_white
+
+
+def _coverage(
+    over_black: np.ndarray, over_white: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(keep, add) layers from the two renders, see render_coverage"""
+    keep = (over_white.astype(np.float32) - over_black) / 255.0
+    add = over_black.astype(np.float32) + 0.5
+    return keep, add
+
+
+def render_coverage(
+    shape: Tuple[int, ...], dtype: np.dtype, draw: Callable[[np.ndarray], object]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Capture what `draw` does to an image as float32 (keep, add) layers
+    Anti-aliased drawing leaves color * coverage + background * (1 - coverage),
+    so drawing once over black and once over white recovers both terms.
+    Drawing onto any image then equals image * keep + add; add includes +0.5
+    so the cast back to uint8 rounds.
+    """
+    return _coverage(*_draw_over_black_and_white(shape, dtype, draw))
+
+
+class HudLayer:
+    """
+    Offscreen copy of the slow-changing HUD (instructions, pose lists, ...)
+    The HUD is drawn only when its key changes; every frame in between just
+    composites the cached layer onto the camera frame. Anything that changes
+    most frames should be drawn directly instead, as a redraw costs far more
+    than drawing straight onto the frame.
+    Text is anti-aliased, so the layer is captured with render_coverage and
+    blends exactly like drawing onto the frame would.
+    """
+
+    def __init__(self):
+        self._key: Hashable = None
+        self._shape: Tuple[int, ...] = ()
+        # (rows, cols, keep, add, scratch) per horizontal band of HUD rows:
+        # the band becomes frame * keep + add
+        self._bands: List[Tuple[slice, slice, np.ndarray, np.ndarray, np.ndarray]] = []
+
+    def blit(
+        self,
+        frame: np.ndarray,
+        key: Hashable,
+        draw: Callable[[np.ndarray], object],
+    ) -> np.ndarray:
+        """
+        Composite the HUD for `key` onto frame in place and return frame
+        `draw(layer)` renders the HUD onto a frame-sized layer; it is only
+        called when the key (or frame shape) differs from the last call.
+        """
+        if key != self._key or frame.shape != self._shape:
+            self._render(frame, draw)
+            self._key = key
+            self._shape = frame.shape
+
+        for rows, cols, keep, add, scratch in self._bands:
+            roi = frame[rows, cols]
+            np.multiply(roi, keep, out=scratch)
+            scratch += add
+            roi[...] = scratch
+        return frame
+
+    def _render(self, frame: np.ndarray, draw: Callable[[np.ndarray], object]) -> None:
+        """Draw the layer and keep only the bands that contain HUD pixels"""
+        over_black, over_white = _draw_over_black_and_white(
+            frame.shape, frame.dtype, draw
+        )
+        # A pixel is painted if drawing moved it off black or off white.
+        # Row/column max and min reductions find those pixels in a fraction of
+        # the time a full-frame comparison would take, and only the painted
+        # bands are ever converted to float.
+        height = frame.shape[0]
+        painted_rows = (over_black.reshape(height, -1).max(axis=1) > 0) | (
+            over_white.reshape(height, -1).min(axis=1) < 255
+        )
+
+        # Text lines are thin, so blending per band of painted rows (trimmed
+        # to its painted columns) touches far less than the whole frame
+        row_edges = np.flatnonzero(
+            np.diff(np.concatenate(([0], painted_rows.astype(np.int8), [0])))
+        )
+        self._bands = []
+        for y0, y1 in zip(row_edges[::2].tolist(), row_edges[1::2].tolist()):
+            # Reduce over rows first: that runs along contiguous memory
+            band_black = over_black[y0:y1].max(axis=0).reshape(frame.shape[1], -1)
+            band_white = over_white[y0:y1].min(axis=0).reshape(frame.shape[1], -1)
+            painted_columns = (band_black.max(axis=1) > 0) | (
+                band_white.min(axis=1) < 255
+            )
+            columns = np.flatnonzero(painted_columns)
+            x0, x1 = int(columns[0]), int(columns[-1]) + 1
+            band_keep, band_add = _coverage(
+                over_black[y0:y1, x0:x1], over_white[y0:y1, x0:x1]
+            )
+            self._bands.append(
+                (
+                    slice(y0, y1),
+                    slice(x0, x1),
+                    band_keep,
+                    band_add,
+                    np.empty_like(band_keep),
+                )
+            )
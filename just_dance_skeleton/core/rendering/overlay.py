@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional, Tuple
 
 import cv2
@@ -7,10 +8,11 @@ from config.settings import (
     GLOW_COLOR,
     GLOW_RADIUS,
     GREEN_RGB,
+    IMPORTANT_KEYPOINT_NAMES,
     IMPORTANT_KEYPOINTS,
     JOINT_COLOR,
     JOINT_RADIUS,
-    POSE_CONNECTIONS,
+    POSE_CONNECTIONS_ARR,
     RED_RGB,
     SKELETON_COLOR,
     SKELETON_THICKNESS,
@@ -18,6 +20,138 @@ from config.settings import (
 )
 
 from ..pose.models import Pose, PoseMatch
+from ._jit import drawable_points, drawable_segments, target_segments
+from .hud import render_coverage
+
+_IMPORTANT_KEYPOINT_SET = frozenset(IMPORTANT_KEYPOINTS)
+
+
+# Overlay text comes from a handful of fixed strings, so measuring and
+# splitting it is memoized rather than redone every frame
+@lru_cache(maxsize=32)
+def _text_size(
+    text: str, font_scale: float, thickness: int
+) -> Tuple[Tuple[int, int], int]:
+    """cv2.getTextSize for FONT: ((width, height), baseline)"""
+    return cv2.getTextSize(text, FONT, font_scale, thickness)
+
+
+@lru_cache(maxsize=32)
+def _split_lines(text: str) -> Tuple[str, ...]:
+    """Lines of a multi-line instruction string"""
+    return tuple(text.split("\n"))
+
+
+@lru_cache(maxsize=256)
+def _text_tile(
+    text: str,
+    font_scale: float,
+    thickness: int,
+    color: Tuple[int, int, int],
+    line_spacing: int = 0,
+) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    (keep, add) layers of cv2.putText output in FONT, see render_coverage
+    Multi-line text puts one line every line_spacing pixels below the first.
+    Also returns the tile's top-left offset (dx, dy) from the first line's origin.
+    """
+    lines = _split_lines(text)
+    sizes = [_text_size(line, font_scale, thickness) for line in lines]
+    width = max(size[0] for size, _ in sizes)
+    ascent = max(size[1] for size, _ in sizes)
+    descent = max(baseline for _, baseline in sizes)
+    # Margin for strokes that overshoot the measured box
+    pad = thickness + 2
+    shape = (
+        ascent + (len(lines) - 1) * line_spacing + descent + 2 * pad,
+        width + 2 * pad,
+        3,
+    )
+
+    def draw(tile: np.ndarray) -> None:
+        for i, line in enumerate(lines):
+            origin = (pad, pad + ascent + i * line_spacing)
+            cv2.putText(tile, line, origin, FONT, font_scale, color, thickness)
+
+    keep, add = render_coverage(shape, np.uint8, draw)
+    return keep, add, -pad, -(pad + ascent)
+
+
+def _composite_tile(
+    frame: np.ndarray, keep: np.ndarray, add: np.ndarray, x: int, y: int
+) -> None:
+    """Blend a (keep, add) tile onto frame with its top-left at (x, y), clipped"""
+    height, width = frame.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + keep.shape[1], width), min(y + keep.shape[0], height)
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    tile = np.s_[y0 - y : y1 - y, x0 - x : x1 - x]
+    roi = frame[y0:y1, x0:x1]
+    roi[...] = roi * keep[tile] + add[tile]
+
+
+_TORSO_KEYPOINT_NAMES = ("LEFT_SHOULDER", "RIGHT_SHOULDER", "LEFT_HIP", "RIGHT_HIP")
+_TORSO_ROWS = np.asarray(
+    [IMPORTANT_KEYPOINT_NAMES.index(name) for name in _TORSO_KEYPOINT_NAMES],
+    dtype=np.int32,
+)
+
+
+def _torso_keypoints(pose: Pose) -> np.ndarray:
+    """(x, y, confidence) rows for _TORSO_KEYPOINT_NAMES; missing joints are zero"""
+    if pose.important_keypoints is not None:
+        return pose.important_keypoints[_TORSO_ROWS]
+
+    torso = np.zeros((len(_TORSO_KEYPOINT_NAMES), 3), dtype=np.float32)
+    for row, name in enumerate(_TORSO_KEYPOINT_NAMES):
+        kp = pose.get_keypoint_by_name(name)
+        if kp:
+            torso[row] = (kp.x, kp.y, kp.confidence)
+    return torso
+
+
+def _fit_torso_transform(
+    target_pose: Pose, detected_pose: Pose
+) -> Optional[np.ndarray]:
+    """
+    Least-squares (2, 3) affine taking the target's torso onto the detected one
+    Fitted on the shoulders and hips confident in both poses, so the limbs
+    still show where the target wants them. None with fewer than 3 usable
+    (non-collinear) joints.
+    """
+    target_torso = _torso_keypoints(target_pose)
+    detected_torso = _torso_keypoints(detected_pose)
+    shared = (target_torso[:, 2] > 0.5) & (detected_torso[:, 2] > 0.5)
+    if np.count_nonzero(shared) < 3:
+        return None
+
+    # Solve [x, y, 1] @ A.T = detected for every shared joint at once
+    source = np.ones((np.count_nonzero(shared), 3))
+    source[:, :2] = target_torso[shared, :2]
+    solution, _, rank, _ = np.linalg.lstsq(
+        source, detected_torso[shared, :2].astype(np.float64), rcond=None
+    )
+    if rank < 3:
+        return None
+    return solution.T
+
+
+def _shoulder_transform(detected: np.ndarray) -> np.ndarray:
+    """
+    (2, 3) affine centring a normalized (0-1) target on the detected shoulders
+    The target is scaled to twice the shoulder width.
+    """
+    (left_x, left_y), (right_x, right_y) = detected[11:13, :2].tolist()
+    scale = abs(right_x - left_x) * 2
+    center_x, center_y = (left_x + right_x) / 2, (left_y + right_y) / 2
+    return np.array(
+        [
+            [scale, 0.0, center_x - scale / 2],
+            [0.0, scale, center_y - scale / 2],
+        ]
+    )
 
 
 class OverlayRenderer:
@@ -30,6 +164,10 @@ class OverlayRenderer:
         self.skeleton_thickness = SKELETON_THICKNESS
         self.glow_color = GLOW_COLOR
         self.glow_radius = GLOW_RADIUS
+        # Precomputed glow blend layers, see _glow_layers
+        self._glow_cache = None
+        # Target overlay layer; black between frames, see _overlay_for
+        self._overlay_buffer: Optional[np.ndarray] = None
 
     def render_pose(
         self,
@@ -37,8 +175,8 @@ class OverlayRenderer:
         pose: Pose,
         color_override: Optional[Tuple[int, int, int]] = None,
     ) -> np.ndarray:
-        """Render a single pose on the frame"""
-        if not pose or not pose.keypoints:
+        """Render a single pose on the frame (modifies it in place, returns frame)"""
+        if not pose or not len(pose.to_array()):
             return frame
 
         skeleton_color = color_override or self.skeleton_color
@@ -57,7 +195,7 @@ class OverlayRenderer:
         target_pose: Optional[Pose],
         pose_match: Optional[PoseMatch],
     ) -> np.ndarray:
-        """Render pose comparison with visual feedback"""
+        """Render pose comparison with visual feedback, drawing on frame in place"""
         if not detected_pose:
             return frame
 
@@ -78,34 +216,13 @@ class OverlayRenderer:
         self, frame: np.ndarray, pose: Pose, color: Tuple[int, int, int]
     ) -> np.ndarray:
         """Draw skeleton connections"""
-        height, width = frame.shape[:2]
+        segments = drawable_segments(
+            pose.to_points(), pose.to_array()[:, 2], POSE_CONNECTIONS_ARR, frame.shape
+        )
 
-        for connection in POSE_CONNECTIONS:
-            start_idx, end_idx = connection
-
-            if start_idx < len(pose.keypoints) and end_idx < len(pose.keypoints):
-                start_kp = pose.keypoints[start_idx]
-                end_kp = pose.keypoints[end_idx]
-
-                # Only draw if both keypoints are confident
-                if start_kp.confidence > 0.5 and end_kp.confidence > 0.5:
-                    start_point = start_kp.to_tuple()
-                    end_point = end_kp.to_tuple()
-
-                    # Ensure points are within frame bounds
-                    if (
-                        0 <= start_point[0] < width
-                        and 0 <= start_point[1] < height
-                        and 0 <= end_point[0] < width
-                        and 0 <= end_point[1] < height
-                    ):
-                        cv2.line(
-                            frame,
-                            start_point,
-                            end_point,
-                            color,
-                            self.skeleton_thickness,
-                        )
+        if len(segments):
+            # One (start, end) polyline per connection, drawn in a single call
+            cv2.polylines(frame, segments, False, color, self.skeleton_thickness)
 
         return frame
 
@@ -113,20 +230,17 @@ class OverlayRenderer:
         self, frame: np.ndarray, pose: Pose, color: Tuple[int, int, int]
     ) -> np.ndarray:
         """Draw joint circles"""
-        height, width = frame.shape[:2]
+        points = pose.to_points()
+        drawable = drawable_points(points, pose.to_array()[:, 2], frame.shape)
 
-        for i, keypoint in enumerate(pose.keypoints):
-            if keypoint.confidence > 0.5:
-                point = keypoint.to_tuple()
+        for i in np.flatnonzero(drawable).tolist():
+            point = tuple(points[i].tolist())
+            # Use different colors for important keypoints
+            joint_color = (255, 255, 0) if i in _IMPORTANT_KEYPOINT_SET else color
+            cv2.circle(frame, point, self.joint_radius, joint_color, -1)
 
-                # Ensure point is within frame bounds
-                if 0 <= point[0] < width and 0 <= point[1] < height:
-                    # Use different colors for important keypoints
-                    joint_color = (255, 255, 0) if i in IMPORTANT_KEYPOINTS else color
-                    cv2.circle(frame, point, self.joint_radius, joint_color, -1)
-
-                    # Add a border
-                    cv2.circle(frame, point, self.joint_radius + 1, (0, 0, 0), 1)
+            # Add a border
+            cv2.circle(frame, point, self.joint_radius + 1, (0, 0, 0), 1)
 
         return frame
 
@@ -136,85 +250,111 @@ class OverlayRenderer:
         hand_foot_indices = [15, 16, 27, 28]  # Wrists and ankles
 
         height, width = frame.shape[:2]
+        confidences = pose.to_array()[:, 2]
+        points = pose.to_points()
+        keep, glow, scratch = self._glow_layers()
+        radius = self.glow_radius
 
         for idx in hand_foot_indices:
-            if idx < len(pose.keypoints):
-                keypoint = pose.keypoints[idx]
-                if keypoint.confidence > 0.7:  # Higher confidence for glow
-                    point = keypoint.to_tuple()
-
-                    if 0 <= point[0] < width and 0 <= point[1] < height:
-                        # Create glow effect with multiple circles
-                        for radius in range(self.glow_radius, 0, -2):
-                            alpha = 0.1 * (self.glow_radius - radius) / self.glow_radius
-                            overlay = frame.copy()
-                            cv2.circle(overlay, point, radius, self.glow_color, -1)
-                            frame = cv2.addWeighted(frame, 1 - alpha, overlay, alpha, 0)
+            if idx < len(points) and confidences[idx] > 0.7:
+                # Higher confidence for glow
+                x, y = points[idx].tolist()
+
+                if 0 <= x < width and 0 <= y < height:
+                    # Blend only the glow's square, clipped to the frame
+                    x0, y0 = max(0, x - radius), max(0, y - radius)
+                    x1, y1 = min(width, x + radius + 1), min(height, y + radius + 1)
+                    layer = np.s_[
+                        y0 - y + radius : y1 - y + radius,
+                        x0 - x + radius : x1 - x + radius,
+                    ]
+                    roi = frame[y0:y1, x0:x1]
+                    blended = scratch[: y1 - y0, : x1 - x0]
+                    np.multiply(roi, keep[layer], out=blended)
+                    blended += glow[layer]
+                    roi[...] = blended
 
         return frame
 
+    def _glow_layers(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per-pixel blend weights for one glow, cached per glow radius/color
+        The glow is a stack of filled circles (radius glow_radius, -2, ...),
+        each alpha-blended over the last. Blending in sequence is the same as
+        one blend: pixel * keep + color * (1 - keep), where keep is the product
+        of (1 - alpha) over the circles covering the pixel. Returns keep, the
+        color term (with +0.5 so the uint8 cast rounds) and a float scratch.
+        """
+        key = (self.glow_radius, tuple(self.glow_color))
+        if self._glow_cache is None or self._glow_cache[0] != key:
+            radius = self.glow_radius
+            size = 2 * radius + 1
+            keep = np.ones((size, size), dtype=np.float32)
+            circle = np.empty((size, size), dtype=np.uint8)
+            for r in range(radius, 0, -2):
+                alpha = 0.1 * (radius - r) / radius
+                circle.fill(0)
+                cv2.circle(circle, (radius, radius), r, 1, -1)
+                keep[circle.view(bool)] *= 1 - alpha
+
+            keep = keep[..., None]
+            glow = (1 - keep) * np.asarray(self.glow_color, dtype=np.float32) + 0.5
+            scratch = np.empty((size, size, 3), dtype=np.float32)
+            self._glow_cache = (key, keep, glow, scratch)
+
+        return self._glow_cache[1:]
+
     def _draw_target_pose_overlay(
         self, frame: np.ndarray, target_pose: Pose, detected_pose: Pose
     ) -> np.ndarray:
         """Draw target pose as a semi-transparent overlay"""
-        height, width = frame.shape[:2]
-        overlay = np.zeros_like(frame)
-
-        # Scale target pose to match detected pose position/size
-        if len(detected_pose.keypoints) >= 2 and len(target_pose.keypoints) >= 2:
-            # Use shoulder positions for alignment
-            det_left_shoulder = detected_pose.get_keypoint(11)  # LEFT_SHOULDER
-            det_right_shoulder = detected_pose.get_keypoint(12)  # RIGHT_SHOULDER
-
-            if det_left_shoulder and det_right_shoulder:
-                # Calculate center and scale
-                det_center_x = (det_left_shoulder.x + det_right_shoulder.x) / 2
-                det_center_y = (det_left_shoulder.y + det_right_shoulder.y) / 2
-                det_scale = abs(det_right_shoulder.x - det_left_shoulder.x)
+        detected = detected_pose.to_array()
+        target = target_pose.to_array()
+
+        # Map the target pose onto the detected pose's torso, or failing that
+        # its shoulders (LEFT_SHOULDER=11, RIGHT_SHOULDER=12)
+        transform = None
+        if len(target) >= 2:
+            transform = _fit_torso_transform(target_pose, detected_pose)
+            if transform is None and len(detected) > 12:
+                transform = _shoulder_transform(detected)
+
+        if transform is not None:
+            # Mapped and filtered in one (compiled) pass
+            height, width = frame.shape[:2]
+            segments = target_segments(
+                target, POSE_CONNECTIONS_ARR, transform, width, height
+            )
 
+            overlay = self._overlay_for(frame)
+            if len(segments):
                 # Draw target pose skeleton in blue/cyan
                 target_color = (255, 255, 0)  # Cyan
+                cv2.polylines(
+                    overlay, segments, False, target_color, self.skeleton_thickness
+                )
 
-                # Draw connections for target pose
-                for connection in POSE_CONNECTIONS:
-                    start_idx, end_idx = connection
-
-                    if start_idx < len(target_pose.keypoints) and end_idx < len(
-                        target_pose.keypoints
-                    ):
-                        start_kp = target_pose.keypoints[start_idx]
-                        end_kp = target_pose.keypoints[end_idx]
-
-                        if start_kp.confidence > 0.5 and end_kp.confidence > 0.5:
-                            # Scale and position target keypoints
-                            start_x = int(
-                                (start_kp.x - 0.5) * det_scale * 2 + det_center_x
-                            )
-                            start_y = int(
-                                (start_kp.y - 0.5) * det_scale * 2 + det_center_y
-                            )
-                            end_x = int((end_kp.x - 0.5) * det_scale * 2 + det_center_x)
-                            end_y = int((end_kp.y - 0.5) * det_scale * 2 + det_center_y)
-
-                            if (
-                                0 <= start_x < width
-                                and 0 <= start_y < height
-                                and 0 <= end_x < width
-                                and 0 <= end_y < height
-                            ):
-                                cv2.line(
-                                    overlay,
-                                    (start_x, start_y),
-                                    (end_x, end_y),
-                                    target_color,
-                                    self.skeleton_thickness,
-                                )
-
-                # Blend overlay with original frame
-                frame = cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
+            # Blend overlay with original frame
+            frame = cv2.addWeighted(frame, 0.7, overlay, 0.3, 0, dst=frame)
+
+            if len(segments):
+                # Erase just the drawn lines so the buffer is black again
+                cv2.polylines(
+                    overlay, segments, False, (0, 0, 0), self.skeleton_thickness
+                )
 
         return frame
 
+    def _overlay_for(self, frame: np.ndarray) -> np.ndarray:
+        """Black overlay buffer matching frame, reused across frames"""
+        if (
+            self._overlay_buffer is None
+            or self._overlay_buffer.shape != frame.shape
+            or self._overlay_buffer.dtype != frame.dtype
+        ):
+            self._overlay_buffer = np.zeros_like(frame)
+        return self._overlay_buffer
+
     def _draw_match_feedback(
         self, frame: np.ndarray, pose_match: PoseMatch
     ) -> np.ndarray:
@@ -235,8 +375,8 @@ class OverlayRenderer:
         font = FONT
         font_scale = 1.0
         thickness = 2
-        (text_width, text_height), baseline = cv2.getTextSize(
-            feedback_text, font, font_scale, thickness
+        (text_width, text_height), baseline = _text_size(
+            feedback_text, font_scale, thickness
         )
         x = (width - text_width) // 2
         y = text_height + 30
@@ -289,25 +429,28 @@ class OverlayRenderer:
     def draw_fps(self, frame: np.ndarray, fps: float) -> np.ndarray:
         """Draw FPS counter"""
         fps_text = f"FPS: {fps:.1f}"
-        cv2.putText(frame, fps_text, (10, 30), FONT, 0.7, (255, 255, 255), 2)
+        # The counter only takes a few hundred distinct values, so each is
+        # rasterized once and composited from the tile cache afterwards
+        keep, add, dx, dy = _text_tile(fps_text, 0.7, 2, (255, 255, 255))
+        _composite_tile(frame, keep, add, 10 + dx, 30 + dy)
         return frame
 
     def draw_instructions(self, frame: np.ndarray, instructions: str) -> np.ndarray:
         """Draw instruction text"""
         height, _width = frame.shape[:2]
-        lines = instructions.split("\n")
+        lines = _split_lines(instructions)
 
-        font = FONT
         font_scale = 0.6
         thickness = 1
         line_spacing = 25
 
         start_y = height - (len(lines) * line_spacing + 20)
 
-        for i, line in enumerate(lines):
-            y_pos = start_y + (i * line_spacing)
-            cv2.putText(
-                frame, line, (10, y_pos), font, font_scale, (255, 255, 255), thickness
-            )
+        # All lines are rendered together into one cached tile, so a change of
+        # instructions costs one rasterization and a frame costs one blend
+        keep, add, dx, dy = _text_tile(
+            instructions, font_scale, thickness, (255, 255, 255), line_spacing
+        )
+        _composite_tile(frame, keep, add, 10 + dx, start_y + dy)
 
         return frame
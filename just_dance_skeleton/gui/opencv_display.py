@@ -1,5 +1,8 @@
+import queue
+import threading
 import time
-from typing import Optional
+from collections import deque
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -7,26 +10,39 @@ from config.settings import FONT, FONT_COLOR, TARGET_FPS, WINDOW_NAME, MAX_POSES
 from core.camera.base import CameraSource
 from core.game.engine import GameEngine
 from core.pose.matcher import DancePoseMatcher
+from core.pose.models import Pose
 from core.pose.tracker import PoseTracker
+from core.rendering.hud import HudLayer
 from core.rendering.overlay import OverlayRenderer
 
+# cv2.pollKey (OpenCV 4.5+) checks for a key without waitKey's 1 ms sleep
+_HAS_POLL_KEY = hasattr(cv2, "pollKey")
+
 
 class OpenCVDisplay:
     """OpenCV-based display for the Just Dance PoC"""
 
     def __init__(self, camera_source: CameraSource):
         self.camera_source = camera_source
-        self.pose_tracker = PoseTracker()
+        # Inference runs on the tracking thread started by run(), which already
+        # overlaps it with rendering
+        self.pose_tracker = PoseTracker(mirror=camera_source.mirror)
         self.pose_matcher = DancePoseMatcher()
         self.overlay_renderer = OverlayRenderer()
+        self.hud_layer = HudLayer()
         self.game_engine = GameEngine(self.pose_matcher)
 
         self.is_running = False
         self.show_target_overlay = True
         self.show_fps = True
-        self.frame_times = []
+        # Timestamps of the last 30 frames for the FPS counter
+        self.frame_times = deque(maxlen=30)
         self.target_frame_time = 1.0 / TARGET_FPS
 
+        # Single-slot handoff from the tracking thread to the render loop:
+        # (frame, poses), or None once the camera stops delivering frames
+        self._tracked_frames: queue.Queue = queue.Queue(maxsize=1)
+
     def run(self) -> None:
         """Main display loop"""
         print("Starting Just Dance Skeleton Tracking...")
@@ -41,19 +57,40 @@ class OpenCVDisplay:
             with self.camera_source as camera:
                 self.is_running = True
 
-                while self.is_running:
-                    loop_start = time.time()
-
-                    ret, frame = camera.read_frame()
-                    if not ret or frame is None:
-                        print("Failed to read frame")
-                        break
-
-                    self._process_frame(frame)
-                    if not self._handle_input():
-                        break
-
-                    self._control_frame_rate(loop_start)
+                # Capture + pose tracking run on their own thread while this
+                # one renders (imshow/waitKey have to stay on the main thread)
+                tracker_thread = threading.Thread(
+                    target=self._track_frames, args=(camera,), daemon=True
+                )
+                tracker_thread.start()
+
+                try:
+                    while self.is_running:
+                        loop_start = time.time()
+
+                        try:
+                            tracked = self._tracked_frames.get(
+                                timeout=self.target_frame_time
+                            )
+                        except queue.Empty:
+                            # No new camera frame means nothing on screen can
+                            # have moved: skip rendering and imshow, and keep
+                            # the window responsive until the next frame
+                            if not self._handle_input():
+                                break
+                            continue
+
+                        if tracked is None:
+                            break
+
+                        frame, poses = tracked
+                        self._process_frame(frame, poses)
+                        if not self._handle_input(self._frame_wait_ms(loop_start)):
+                            break
+                finally:
+                    # Let the tracking thread finish before the camera closes
+                    self.is_running = False
+                    tracker_thread.join()
 
         except KeyboardInterrupt:
             print("\nInterrupted by user")
@@ -62,9 +99,39 @@ class OpenCVDisplay:
         finally:
             self.cleanup()
 
-    def _process_frame(self, frame: np.ndarray) -> None:
-        """Process a single frame"""
-        poses = self.pose_tracker.process_frame(frame)
+    def _track_frames(self, camera: CameraSource) -> None:
+        """Tracking thread: read frames and run pose tracking on them"""
+        try:
+            while self.is_running:
+                ret, frame = camera.read_frame()
+                if not ret or frame is None:
+                    print("Failed to read frame")
+                    break
+
+                _, inference_frame = camera.read_inference_frame()
+                poses = self.pose_tracker.process_frame(frame, inference_frame)
+                self._hand_off((frame, poses))
+
+        except Exception as e:
+            print(f"Error in tracking thread: {e}")
+
+        self._hand_off(None)
+
+    def _hand_off(self, tracked: Optional[Tuple[np.ndarray, List[Pose]]]) -> None:
+        """Replace whatever the render loop hasn't picked up yet"""
+        while True:
+            try:
+                self._tracked_frames.put_nowait(tracked)
+                return
+            except queue.Full:
+                # Renderer is behind: drop the stale frame, keep the freshest
+                try:
+                    self._tracked_frames.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _process_frame(self, frame: np.ndarray, poses: List[Pose]) -> None:
+        """Update the game with a tracked frame and show it"""
         detected_pose = poses[0] if poses else None
         self.game_engine.update(detected_pose)
         display_frame = self._render_frame(frame, detected_pose)
@@ -75,7 +142,11 @@ class OpenCVDisplay:
         self, frame: np.ndarray, detected_pose: Optional[object]
     ) -> np.ndarray:
         """Render all overlays on the frame"""
-        display_frame = frame.copy()
+        # The camera frame belongs to us and is discarded after this, so draw
+        # straight onto it (the tracker has already taken its own copy)
+        if self.camera_source.mirror:
+            cv2.flip(frame, 1, dst=frame)
+        display_frame = frame
 
         if detected_pose:
             if self.game_engine.game_state.is_playing:
@@ -90,43 +161,68 @@ class OpenCVDisplay:
                     target_pose,
                     self.game_engine.game_state.current_match,
                 )
-                display_frame = self._draw_game_ui(display_frame)
+                hud = ("game", self._game_hud_state())
 
             else:
                 # Free play mode - just show skeleton
                 display_frame = self.overlay_renderer.render_pose(
                     display_frame, detected_pose
                 )
-                display_frame = self._draw_available_poses(display_frame)
+                hud = ("free", self.pose_matcher.get_pose_names())
+        else:
+            hud = None
+
+        # Target name, combo, pose list and instructions only change every so
+        # often, so they are drawn once into the HUD layer and copied in until
+        # they do. Score, timer and hold progress change nearly every frame and
+        # are drawn directly.
+        instructions = self._get_instructions()
+        display_frame = self.hud_layer.blit(
+            display_frame,
+            (hud, instructions),
+            lambda layer: self._draw_hud(layer, hud, instructions),
+        )
+        if hud is not None and hud[0] == "game":
+            display_frame = self._draw_game_status(display_frame)
 
         if self.show_fps:
             fps = self._get_current_fps()
             display_frame = self.overlay_renderer.draw_fps(display_frame, fps)
 
-        instructions = self._get_instructions()
-        display_frame = self.overlay_renderer.draw_instructions(
-            display_frame, instructions
-        )
-
         return display_frame
 
-    def _draw_game_ui(self, frame: np.ndarray) -> np.ndarray:
-        """Draw game-specific UI elements"""
-        height, width = frame.shape[:2]
-        score_text = f"Score: {self.game_engine.game_state.score:.0f}"
-        cv2.putText(
-            frame,
-            score_text,
-            (width - 200, 30),
-            FONT,
-            0.8,
-            FONT_COLOR,
-            2,
+    def _draw_hud(
+        self, frame: np.ndarray, hud: Optional[tuple], instructions: str
+    ) -> np.ndarray:
+        """Draw the HUD for a key built by _render_frame"""
+        if hud is not None:
+            mode, state = hud
+            if mode == "game":
+                frame = self._draw_game_ui(frame, state)
+            else:
+                frame = self._draw_available_poses(frame, state)
+
+        return self.overlay_renderer.draw_instructions(frame, instructions)
+
+    def _game_hud_state(self) -> tuple:
+        """
+        The slow-changing part of the game UI drawn by _draw_game_ui
+        Equal states draw identical pixels, so this doubles as the HUD key.
+        """
+        return (
+            self.game_engine.game_state.combo_count,
+            self.game_engine.get_current_pose_name(),
+            self.game_engine.get_remaining_poses(),
         )
 
+    def _draw_game_ui(self, frame: np.ndarray, state: tuple) -> np.ndarray:
+        """Draw game-specific UI elements from a _game_hud_state() tuple"""
+        height, width = frame.shape[:2]
+        combo_count, target_name, remaining = state
+
         # COmbo counter
-        if self.game_engine.game_state.combo_count > 0:
-            combo_text = f"Combo: x{self.game_engine.game_state.combo_count}"
+        if combo_count > 0:
+            combo_text = f"Combo: x{combo_count}"
             cv2.putText(
                 frame,
                 combo_text,
@@ -137,7 +233,6 @@ class OpenCVDisplay:
                 2,
             )
 
-        target_name = self.game_engine.get_current_pose_name()
         target_text = f"Target: {target_name}"
         cv2.putText(
             frame,
@@ -149,9 +244,41 @@ class OpenCVDisplay:
             2,
         )
 
+        # Draw remaining poses count
+        if remaining > 0:
+            remaining_text = f"Remaining: {remaining}"
+            cv2.putText(
+                frame,
+                remaining_text,
+                (10, height - 90),
+                FONT,
+                0.6,
+                FONT_COLOR,
+                1,
+            )
+
+        return frame
+
+    def _draw_game_status(self, frame: np.ndarray) -> np.ndarray:
+        """Draw the score, hold progress and game time, which change every frame"""
+        height, width = frame.shape[:2]
+        now = time.monotonic()
+        game_state = self.game_engine.game_state
+
+        score_text = f"Score: {game_state.score_at(now):.0f}"
+        cv2.putText(
+            frame,
+            score_text,
+            (width - 200, 30),
+            FONT,
+            0.8,
+            FONT_COLOR,
+            2,
+        )
+
         # Draw progress bar for pose hold
         if self.game_engine.is_pose_being_held():
-            progress = self.game_engine.get_progress()
+            progress = self.game_engine.get_progress(now)
 
             bar_width = 300
             bar_height = 20
@@ -189,23 +316,8 @@ class OpenCVDisplay:
                 1,
             )
 
-        # Draw remaining poses count
-        remaining = self.game_engine.get_remaining_poses()
-        if remaining > 0:
-            remaining_text = f"Remaining: {remaining}"
-            cv2.putText(
-                frame,
-                remaining_text,
-                (10, height - 90),
-                FONT,
-                0.6,
-                FONT_COLOR,
-                1,
-            )
-
         # Draw game time
-        game_time = self.game_engine.get_game_time()
-        time_text = f"Time: {game_time:.1f}s"
+        time_text = f"Time: {self.game_engine.get_game_time(now):.1f}s"
         cv2.putText(
             frame,
             time_text,
@@ -218,10 +330,10 @@ class OpenCVDisplay:
 
         return frame
 
-    def _draw_available_poses(self, frame: np.ndarray) -> np.ndarray:
+    def _draw_available_poses(
+        self, frame: np.ndarray, available_poses: Tuple[str, ...]
+    ) -> np.ndarray:
         """Draw list of available poses in free play mode"""
-        available_poses = self.pose_matcher.get_pose_names()
-
         if available_poses:
             y_start = 100
             cv2.putText(
@@ -259,9 +371,19 @@ class OpenCVDisplay:
                 "SPACE: Start game | T: Toggle target overlay | F: Toggle FPS | Q: Quit"
             )
 
-    def _handle_input(self) -> bool:
-        """Handle keyboard input. Returns False to quit."""
-        key = cv2.waitKey(1) & 0xFF
+    def _handle_input(self, wait_ms: int = 0) -> bool:
+        """
+        Handle keyboard input. Returns False to quit.
+        Waits up to wait_ms for a key, which also paces the frame rate; with
+        no time left it only polls, as even waitKey(1) sleeps for a millisecond.
+        """
+        if wait_ms > 0:
+            key = cv2.waitKey(wait_ms)
+        elif _HAS_POLL_KEY:
+            key = cv2.pollKey()
+        else:
+            key = cv2.waitKey(1)
+        key &= 0xFF
 
         if key == ord("q") or key == 27:  # Q or ESC
             return False
@@ -284,12 +406,8 @@ class OpenCVDisplay:
 
     def _update_fps(self) -> None:
         """Update FPS calculation"""
-        current_time = time.time()
-        self.frame_times.append(current_time)
-
-        # Keep only last 30 frames for FPS calculation
-        if len(self.frame_times) > 30:
-            self.frame_times.pop(0)
+        # The deque drops the oldest timestamp once it holds 30
+        self.frame_times.append(time.time())
 
     def _get_current_fps(self) -> float:
         """Get current FPS"""
@@ -301,13 +419,10 @@ class OpenCVDisplay:
             return (len(self.frame_times) - 1) / time_span
         return 0.0
 
-    def _control_frame_rate(self, loop_start: float) -> None:
-        """Control frame rate to target FPS"""
-        elapsed = time.time() - loop_start
-        sleep_time = self.target_frame_time - elapsed
-
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+    def _frame_wait_ms(self, loop_start: float) -> int:
+        """Milliseconds left in this frame's budget at the target FPS"""
+        elapsed_ms = int((time.time() - loop_start) * 1000)
+        return max(0, int(self.target_frame_time * 1000) - elapsed_ms)
 
     def cleanup(self) -> None:
         """Clean up resources"""
@@ -16,9 +16,10 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from config.settings import CAMERA_FPS, CAMERA_HEIGHT, CAMERA_WIDTH, WEBCAM_ID
-from core.camera.kinect import KinectSource
 from core.camera.webcam import WebcamSource
-from gui.opencv_display import OpenCVDisplay
+
+# KinectSource and OpenCVDisplay (which pulls in MediaPipe) are imported where
+# they're used, so --list-cameras and webcam runs don't pay for them up front
 
 
 def parse_arguments():
@@ -90,6 +91,8 @@ def list_available_cameras():
         print("\nNo webcams found")
 
     # TODO - Figure out xbox one
+    from core.camera.kinect import KinectSource
+
     kinect_devices = KinectSource.list_available_kinects()
     if kinect_devices:
         print(f"\nKinect devices found: {len(kinect_devices)}")
@@ -106,6 +109,8 @@ def create_camera_source(args):
 
     if args.kinect:
         print("Attempting to use Kinect...")
+        from core.camera.kinect import KinectSource
+
         camera = KinectSource(width=width, height=height, fps=fps)
         if not camera.is_available():
             print("Kinect not available, falling back to webcam")
@@ -149,6 +154,8 @@ def main():
     )
 
     try:
+        from gui.opencv_display import OpenCVDisplay
+
         display = OpenCVDisplay(camera_source)
         display.run()
     except KeyboardInterrupt:
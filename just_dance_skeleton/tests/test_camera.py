@@ -1,6 +1,13 @@
+import tempfile
+import threading
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import cv2
+import numpy as np
+
+from config.settings import POSE_INFERENCE_HEIGHT, POSE_INFERENCE_WIDTH
 from core.camera.base import CameraSource
 from core.camera.webcam import WebcamSource
 
@@ -38,32 +45,178 @@ class TestCameraSources(unittest.TestCase):
         self.assertFalse(camera.is_opened)
         self.assertTrue(camera.close_called)
 
+    @patch("core.camera.webcam.glob.glob")
+    @patch("core.camera.webcam.sys.platform", "linux")
+    def test_list_available_cameras_reads_video_devices_on_linux(self, mock_glob):
+        mock_glob.return_value = ["/dev/video10", "/dev/video0", "/dev/video2"]
+
+        available = WebcamSource.list_available_cameras(refresh=True)
+
+        self.assertEqual(available, [0, 2, 10])
+
+        # Cached until a refresh is requested
+        mock_glob.return_value = []
+        self.assertEqual(WebcamSource.list_available_cameras(), [0, 2, 10])
+
+    @patch("core.camera.webcam.glob.glob")
+    @patch("core.camera.webcam.sys.platform", "linux")
+    def test_list_available_cameras_skips_metadata_nodes(self, mock_glob):
+        mock_glob.return_value = ["/dev/video0", "/dev/video1", "/dev/video2"]
+        with tempfile.TemporaryDirectory() as sysfs:
+            # video0/video1 are one UVC webcam; video2 has no sysfs entry
+            for node, index in (("video0", "0"), ("video1", "1")):
+                Path(sysfs, node).mkdir()
+                Path(sysfs, node, "index").write_text(index + "\n")
+
+            with patch.object(WebcamSource, "sysfs_video_root", sysfs):
+                available = WebcamSource.list_available_cameras(refresh=True)
+
+        self.assertEqual(available, [0, 2])
+
     @patch("core.camera.webcam.cv2.VideoCapture")
+    @patch("core.camera.webcam.sys.platform", "win32")
     def test_list_available_cameras_returns_empty_when_all_closed(self, mock_capture):
         closed_capture = MagicMock()
         closed_capture.isOpened.return_value = False
         mock_capture.return_value = closed_capture
 
-        available = WebcamSource.list_available_cameras()
+        available = WebcamSource.list_available_cameras(refresh=True)
 
         self.assertEqual(available, [])
         self.assertEqual(mock_capture.call_count, 10)
 
     @patch("core.camera.webcam.cv2.VideoCapture")
+    @patch("core.camera.webcam.sys.platform", "win32")
     def test_list_available_cameras_returns_open_indices(self, mock_capture):
         open_indices = {0, 2, 5}
 
-        def _capture_factory(index):
+        def _capture_factory(index, backend):
+            self.assertEqual(backend, cv2.CAP_MSMF)
             cap = MagicMock()
             cap.isOpened.return_value = index in open_indices
             return cap
 
         mock_capture.side_effect = _capture_factory
 
-        available = WebcamSource.list_available_cameras()
+        available = WebcamSource.list_available_cameras(refresh=True)
 
         self.assertEqual(available, [0, 2, 5])
 
+    @patch("core.camera.webcam.cv2.VideoCapture")
+    @patch("core.camera.webcam.sys.platform", "win32")
+    def test_list_available_cameras_gives_up_on_stuck_probes(self, mock_capture):
+        unblock = threading.Event()
+
+        def _capture_factory(index, backend):
+            if index == 1:
+                unblock.wait(timeout=5)  # Driver never answers
+            cap = MagicMock()
+            cap.isOpened.return_value = index in (0, 1)
+            return cap
+
+        mock_capture.side_effect = _capture_factory
+
+        with patch.object(WebcamSource, "probe_timeout", 0.2):
+            available = WebcamSource.list_available_cameras(refresh=True)
+        unblock.set()
+
+        self.assertEqual(available, [0])
+
+    def test_default_backend_matches_platform(self):
+        for platform, backend in [
+            ("linux", cv2.CAP_V4L2),
+            ("win32", cv2.CAP_MSMF),
+            ("darwin", cv2.CAP_AVFOUNDATION),
+        ]:
+            with patch("core.camera.webcam.sys.platform", platform):
+                self.assertEqual(WebcamSource().backend, backend)
+
+        self.assertEqual(WebcamSource(backend=cv2.CAP_ANY).backend, cv2.CAP_ANY)
+
+    @patch("core.camera.webcam.cv2.VideoCapture")
+    def test_open_requests_single_frame_buffer_and_mjpg(self, mock_capture):
+        capture = MagicMock()
+        capture.isOpened.return_value = True
+        capture.get.return_value = 0
+        capture.grab.return_value = False
+        mock_capture.return_value = capture
+
+        webcam = WebcamSource(camera_id=0)
+        self.assertTrue(webcam.open())
+        webcam.close()
+
+        mock_capture.assert_called_once_with(0, webcam.backend)
+        set_calls = [call.args for call in capture.set.call_args_list]
+        self.assertIn((cv2.CAP_PROP_BUFFERSIZE, 1), set_calls)
+        self.assertIn((cv2.CAP_PROP_FOURCC, cv2.VideoWriter.fourcc(*"MJPG")), set_calls)
+
+    @patch("core.camera.webcam.cv2.VideoCapture")
+    def test_read_frame_returns_latest_captured_frame_once(self, mock_capture):
+        frame = np.zeros((4, 6, 3), dtype=np.uint8)
+        frame[:, 0] = 255
+        grabs = iter([True])
+
+        capture = MagicMock()
+        capture.isOpened.return_value = True
+        capture.get.return_value = 0
+        capture.grab.side_effect = lambda: next(grabs, False)
+        capture.retrieve.return_value = (True, frame)
+        mock_capture.return_value = capture
+
+        webcam = WebcamSource(camera_id=0)
+        webcam.read_timeout = 0.5
+        self.assertTrue(webcam.open())
+
+        ret, latest = webcam.read_frame()
+        self.assertTrue(ret)
+        # Frames are handed out unflipped; mirroring happens downstream
+        self.assertIs(latest, frame)
+        self.assertTrue(webcam.mirror)
+
+        ret, inference_frame = webcam.read_inference_frame()
+        self.assertTrue(ret)
+        self.assertEqual(
+            inference_frame.shape,
+            (POSE_INFERENCE_HEIGHT, POSE_INFERENCE_WIDTH, 3),
+        )
+        self.assertEqual(inference_frame.dtype, np.uint8)
+
+        # The capture thread has stopped, so there is nothing newer to hand out
+        self.assertEqual(webcam.read_frame(), (False, None))
+
+        webcam.close()
+        self.assertFalse(webcam.is_opened)
+
+    @patch("core.camera.webcam.cv2.VideoCapture")
+    def test_close_leaves_release_to_a_reader_stuck_in_grab(self, mock_capture):
+        in_grab = threading.Event()
+        unblock = threading.Event()
+
+        def stuck_grab():
+            in_grab.set()
+            unblock.wait(timeout=5)
+            return False
+
+        capture = MagicMock()
+        capture.isOpened.return_value = True
+        capture.get.return_value = 0
+        capture.grab.side_effect = stuck_grab
+        mock_capture.return_value = capture
+
+        webcam = WebcamSource(camera_id=0)
+        webcam.read_timeout = 0.05
+        self.assertTrue(webcam.open())
+        self.assertTrue(in_grab.wait(timeout=5))
+        reader = webcam._thread
+
+        webcam.close()
+        # The reader is still inside grab(), so the capture is left alone
+        capture.release.assert_not_called()
+
+        unblock.set()
+        reader.join(timeout=5)
+        capture.release.assert_called_once_with()
+
 
 if __name__ == "__main__":
     unittest.main()
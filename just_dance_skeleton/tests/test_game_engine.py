@@ -0,0 +1,95 @@
+import json
+import math
+import tempfile
+import unittest
+from pathlib import Path
+
+from config.settings import SCORE_DECAY_RATE
+from core.game.engine import GameEngine
+from core.pose.matcher import DancePoseMatcher
+from core.pose.models import GameState
+
+
+def _pose_payload(name):
+    return {
+        "name": name,
+        "keypoints": [
+            {"name": "LEFT_SHOULDER", "x": 0.4, "y": 0.3, "confidence": 1.0},
+            {"name": "RIGHT_SHOULDER", "x": 0.6, "y": 0.3, "confidence": 1.0},
+        ],
+    }
+
+
+class TestGameEngine(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        poses_path = Path(self.temp_dir.name) / "test_poses.json"
+        payload = {"poses": [_pose_payload(name) for name in ("A", "B", "C")]}
+        poses_path.write_text(json.dumps(payload), encoding="utf-8")
+        self.matcher = DancePoseMatcher(str(poses_path))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_seeded_engines_generate_identical_sequences(self):
+        first = GameEngine(self.matcher, seed=42)
+        second = GameEngine(self.matcher, seed=42)
+
+        first.start_game()
+        second.start_game()
+
+        self.assertEqual(len(first.target_pose_sequence), 5)
+        self.assertEqual(first.target_pose_sequence, second.target_pose_sequence)
+
+    def test_start_game_uses_given_sequence(self):
+        engine = GameEngine(self.matcher)
+
+        engine.start_game(["B", "C"])
+
+        self.assertTrue(engine.game_state.is_playing)
+        self.assertEqual(engine.get_current_pose_name(), "B")
+        self.assertEqual(engine.get_remaining_poses(), 2)
+
+    def test_start_game_skips_unknown_pose_names(self):
+        engine = GameEngine(self.matcher)
+
+        engine.start_game(["Missing", "C"])
+
+        self.assertEqual([pose.name for pose in engine.target_pose_sequence], ["C"])
+        self.assertIs(engine.game_state.target_pose, self.matcher.dance_poses["C"])
+
+    def test_stop_game_ends_session(self):
+        engine = GameEngine(self.matcher, seed=0)
+        engine.start_game()
+
+        engine.stop_game()
+
+        self.assertFalse(engine.game_state.is_playing)
+        self.assertEqual(engine.get_progress(), 0.0)
+
+
+class TestGameStateScore(unittest.TestCase):
+    def test_score_decays_lazily_and_freezes(self):
+        state = GameState(score_log_decay=math.log(SCORE_DECAY_RATE))
+        state.score_time = 10.0
+
+        state.add_score(100.0, now=10.0)
+        self.assertAlmostEqual(state.score_at(12.0), 100.0 * SCORE_DECAY_RATE**2)
+
+        state.add_score(50.0, now=12.0)
+        self.assertAlmostEqual(state.score_at(12.0), 100.0 * SCORE_DECAY_RATE**2 + 50)
+
+        state.freeze_score(now=13.0)
+        self.assertEqual(state.score_at(100.0), state.score_at(13.0))
+
+    def test_score_without_timestamp_does_not_decay(self):
+        state = GameState(score_base=120.0, score_log_decay=math.log(0.5))
+
+        self.assertEqual(state.score_at(5.0), 120.0)
+
+        state.add_score(30.0, now=9.0)
+        self.assertEqual(state.score_at(20.0), 150.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
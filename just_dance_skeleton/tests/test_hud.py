@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import MagicMock
+
+import cv2
+import numpy as np
+
+from config.settings import FONT
+from core.rendering.hud import HudLayer
+
+
+def _draw_text(frame):
+    cv2.putText(frame, "Score: 120", (20, 30), FONT, 0.8, (255, 255, 255), 2)
+    cv2.rectangle(frame, (40, 70), (140, 90), (50, 50, 50), -1)
+    cv2.rectangle(frame, (0, 100), (8, 118), (0, 0, 0), -1)
+    cv2.putText(frame, "Time: 3.4s", (10, 110), FONT, 0.6, (0, 255, 255), 1)
+    return frame
+
+
+class TestHudLayer(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+
+    def test_blit_matches_drawing_directly(self):
+        expected = _draw_text(self.frame.copy())
+
+        blitted = HudLayer().blit(self.frame.copy(), "key", _draw_text)
+
+        np.testing.assert_array_equal(blitted, expected)
+
+    def test_layer_is_redrawn_only_when_key_changes(self):
+        hud = HudLayer()
+        draw = MagicMock(side_effect=_draw_text)
+
+        # Each redraw renders the layer over black and over white
+        for _ in range(3):
+            hud.blit(self.frame.copy(), ("game", 1), draw)
+        self.assertEqual(draw.call_count, 2)
+
+        hud.blit(self.frame.copy(), ("game", 2), draw)
+        hud.blit(self.frame[:60].copy(), ("game", 2), draw)
+        self.assertEqual(draw.call_count, 6)
+
+    def test_empty_hud_leaves_frame_untouched(self):
+        blitted = HudLayer().blit(self.frame.copy(), None, lambda layer: layer)
+
+        np.testing.assert_array_equal(blitted, self.frame)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from config.settings import (
+    FONT,
+    IMPORTANT_KEYPOINTS_ARR,
+    KEYPOINT_NAMES,
+    POSE_CONNECTIONS,
+    POSE_CONNECTIONS_ARR,
+)
+from core.pose.models import Pose
+from core.rendering import _jit
+from core.rendering.overlay import OverlayRenderer, _fit_torso_transform
+
+
+def _pose(points, confidence=0.9):
+    """33-keypoint pose with the given {index: (x, y)} positions visible."""
+    keypoints = np.zeros((33, 3), dtype=np.float32)
+    for idx, (x, y) in points.items():
+        keypoints[idx] = (x, y, confidence)
+    return Pose(confidence=confidence, keypoint_array=keypoints)
+
+
+def _reference_glow(renderer, frame, point):
+    """Original glow: one full-frame copy and blend per circle."""
+    for radius in range(renderer.glow_radius, 0, -2):
+        alpha = 0.1 * (renderer.glow_radius - radius) / renderer.glow_radius
+        overlay = frame.copy()
+        cv2.circle(overlay, point, radius, renderer.glow_color, -1)
+        frame = cv2.addWeighted(frame, 1 - alpha, overlay, alpha, 0)
+    return frame
+
+
+def _reference_target_overlay(renderer, frame, target_pose, detected_pose):
+    """Original target overlay: per-connection scaling and bounds checks."""
+    height, width = frame.shape[:2]
+    overlay = np.zeros_like(frame)
+    left = detected_pose.get_keypoint(11)
+    right = detected_pose.get_keypoint(12)
+    center_x, center_y = (left.x + right.x) / 2, (left.y + right.y) / 2
+    scale = abs(right.x - left.x)
+    for start_idx, end_idx in POSE_CONNECTIONS:
+        if max(start_idx, end_idx) >= len(target_pose.keypoints):
+            continue
+        start_kp = target_pose.keypoints[start_idx]
+        end_kp = target_pose.keypoints[end_idx]
+        if start_kp.confidence > 0.5 and end_kp.confidence > 0.5:
+            start = (
+                int((start_kp.x - 0.5) * scale * 2 + center_x),
+                int((start_kp.y - 0.5) * scale * 2 + center_y),
+            )
+            end = (
+                int((end_kp.x - 0.5) * scale * 2 + center_x),
+                int((end_kp.y - 0.5) * scale * 2 + center_y),
+            )
+            if all(0 <= x < width and 0 <= y < height for x, y in (start, end)):
+                cv2.line(
+                    overlay, start, end, (255, 255, 0), renderer.skeleton_thickness
+                )
+    return cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
+
+
+class TestOverlayRenderer(unittest.TestCase):
+    def setUp(self):
+        self.renderer = OverlayRenderer()
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+
+    def test_glow_matches_sequential_blending(self):
+        # Left wrist in the middle, right ankle clipped by the corner
+        pose = _pose({15: (80, 60), 28: (3, 117)})
+
+        expected = _reference_glow(self.renderer, self.frame.copy(), (80, 60))
+        expected = _reference_glow(self.renderer, expected, (3, 117))
+        glowing = self.renderer._draw_hand_foot_glow(self.frame.copy(), pose)
+
+        # The reference rounds to uint8 after every circle
+        diff = np.abs(glowing.astype(np.int16) - expected.astype(np.int16))
+        self.assertLessEqual(diff.max(), 2)
+        self.assertGreater(np.abs(glowing.astype(np.int16) - self.frame).max(), 10)
+
+    def test_glow_skips_low_confidence_and_other_joints(self):
+        pose = _pose({15: (80, 60)}, confidence=0.6)
+        pose.keypoint_array[0] = (40, 40, 1.0)  # NOSE never glows
+
+        glowing = self.renderer._draw_hand_foot_glow(self.frame.copy(), pose)
+
+        np.testing.assert_array_equal(glowing, self.frame)
+
+    def test_render_pose_draws_only_visible_joints(self):
+        frame = np.zeros_like(self.frame)
+        pose = _pose({11: (60, 50), 12: (100, 50)})
+        pose.keypoint_array[13] = (20, 20, 0.1)  # Hidden elbow
+
+        self.renderer.render_pose(frame, pose)
+
+        self.assertTrue(frame[50, 60].any())
+        self.assertTrue(frame[50, 80].any())  # Shoulder connection
+        self.assertFalse(frame[20, 20].any())
+
+    def test_target_overlay_matches_per_connection_drawing(self):
+        rng = np.random.default_rng(1)
+        target = rng.uniform(0.0, 1.0, (33, 3)).astype(np.float32)
+        target[:, 2] = np.where(rng.uniform(size=33) < 0.8, 1.0, 0.2)
+        target_pose = Pose(confidence=1.0, keypoint_array=target)
+        detected_pose = _pose({11: (60, 50), 12: (100, 52)})
+
+        expected = _reference_target_overlay(
+            self.renderer, self.frame, target_pose, detected_pose
+        )
+        overlaid = self.renderer._draw_target_pose_overlay(
+            self.frame.copy(), target_pose, detected_pose
+        )
+
+        np.testing.assert_array_equal(overlaid, expected)
+        # Some connections were actually drawn
+        blank = cv2.addWeighted(self.frame, 0.7, np.zeros_like(self.frame), 0.3, 0)
+        self.assertFalse(np.array_equal(overlaid, blank))
+
+        # The reused overlay buffer is left black for the next frame
+        self.assertFalse(self.renderer._overlay_buffer.any())
+        overlaid = self.renderer._draw_target_pose_overlay(
+            self.frame.copy(), target_pose, detected_pose
+        )
+        np.testing.assert_array_equal(overlaid, expected)
+
+    def test_torso_fit_recovers_affine_between_poses(self):
+        names = [KEYPOINT_NAMES[idx] for idx in range(33)]
+        rng = np.random.default_rng(3)
+        target = np.ones((33, 3), dtype=np.float32)
+        target[:, :2] = rng.uniform(0.2, 0.8, (33, 2))
+        transform = np.array([[120.0, 10.0, 30.0], [-5.0, 110.0, 15.0]])
+        detected = target.copy()
+        detected[:, :2] = target[:, :2] @ transform[:, :2].T + transform[:, 2]
+        target_pose = Pose(keypoint_array=target, keypoint_names=names)
+        detected_pose = Pose(
+            keypoint_array=detected,
+            important_keypoints=detected[IMPORTANT_KEYPOINTS_ARR],
+        )
+
+        fitted = _fit_torso_transform(target_pose, detected_pose)
+        np.testing.assert_allclose(fitted, transform, atol=1e-2)
+
+        # Two hidden torso joints leave too little to fit
+        detected_pose.important_keypoints[[0, 6], 2] = 0.0
+        self.assertIsNone(_fit_torso_transform(target_pose, detected_pose))
+
+    def test_fps_tiles_match_put_text(self):
+        for fps in (29.84, 29.84, 7.0):
+            expected = self.frame.copy()
+            cv2.putText(
+                expected, f"FPS: {fps:.1f}", (10, 30), FONT, 0.7, (255, 255, 255), 2
+            )
+
+            drawn = self.renderer.draw_fps(self.frame.copy(), fps)
+
+            np.testing.assert_array_equal(drawn, expected)
+
+        # A frame smaller than the tile is clipped rather than failing
+        corner = self.frame[:20, :40].copy()
+        self.renderer.draw_fps(corner, 30.0)
+
+    def test_instruction_tile_matches_put_text(self):
+        instructions = "SPACE: Start game | Q: Quit\nT: Toggle overlay\nF: FPS"
+        expected = self.frame.copy()
+        for i, line in enumerate(instructions.split("\n")):
+            y_pos = 120 - (3 * 25 + 20) + i * 25
+            cv2.putText(expected, line, (10, y_pos), FONT, 0.6, (255, 255, 255), 1)
+
+        drawn = self.renderer.draw_instructions(self.frame.copy(), instructions)
+
+        # putText rounds to uint8 after each line, so where two lines touch
+        # the reference can differ by one
+        diff = np.abs(drawn.astype(np.int16) - expected.astype(np.int16))
+        self.assertLessEqual(diff.max(), 1)
+        self.assertLessEqual(np.count_nonzero(diff), 4)
+
+
+class TestOverlayKernels(unittest.TestCase):
+    @unittest.skipUnless(_jit.NUMBA_AVAILABLE, "numba not installed")
+    def test_numba_target_segments_match_numpy(self):
+        rng = np.random.default_rng(2)
+        target = rng.uniform(-0.2, 1.2, (33, 3)).astype(np.float32)
+        transform = np.array([[83.0, -9.5, 56.0], [7.25, 81.0, 20.75]])
+        args = (POSE_CONNECTIONS_ARR, transform, 160, 120)
+
+        expected = _jit._target_segments_numpy(target, *args)
+        segments = _jit._target_segments_numba(target, *args)
+
+        self.assertGreater(len(expected), 0)
+        np.testing.assert_array_equal(segments, expected)
+
+    def test_target_segments_skip_missing_keypoints(self):
+        # A 15-keypoint pose has no rows for most MediaPipe connections
+        target = np.full((15, 3), 0.5, dtype=np.float32)
+        target[:, 2] = 1.0
+
+        transform = np.array([[40.0, 0.0, 60.0], [0.0, 40.0, 40.0]])
+        segments = _jit.target_segments(
+            target, POSE_CONNECTIONS_ARR, transform, 160, 120
+        )
+
+        in_pose = int((POSE_CONNECTIONS_ARR < 15).all(axis=1).sum())
+        self.assertEqual(segments.shape, (in_pose, 2, 2))
+        # Every keypoint sits at the centre of the normalized pose
+        self.assertTrue((segments == (80, 60)).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
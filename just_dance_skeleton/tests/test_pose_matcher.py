@@ -1,9 +1,14 @@
 import json
+import os
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
-from core.pose.matcher import DancePoseMatcher
+import numpy as np
+
+from core.pose import _jit, matcher
+from core.pose.matcher import DancePoseMatcher, _normalize_xy
 from core.pose.models import Keypoint, Pose
 
 
@@ -56,6 +61,17 @@ class TestDancePoseMatcher(unittest.TestCase):
     def test_loads_custom_pose_file(self):
         self.assertIn("Reference", self.matcher.get_pose_names())
 
+    def test_pose_names_cache_refreshes_after_library_changes(self):
+        names = self.matcher.get_pose_names()
+        self.assertIs(names, self.matcher.get_pose_names())
+
+        template_pose = self.matcher.dance_poses["Reference"].to_pose()
+        self.matcher.add_dance_pose("Copy", template_pose)
+        self.assertEqual(self.matcher.get_pose_names(), ("Reference", "Copy"))
+
+        self.matcher.remove_dance_pose("Reference")
+        self.assertEqual(self.matcher.get_pose_names(), ("Copy",))
+
     def test_exact_pose_returns_perfect_match(self):
         detected_pose = self.matcher.dance_poses["Reference"].to_pose()
 
@@ -66,6 +82,157 @@ class TestDancePoseMatcher(unittest.TestCase):
         self.assertTrue(pose_match.is_perfect_match)
         self.assertAlmostEqual(pose_match.similarity, 1.0)
 
+    def test_keypoint_array_is_cached_on_detected_pose(self):
+        reference = self.matcher.dance_poses["Reference"]
+        detected_pose = Pose(reference.keypoints.copy(), 1.0)
+        self.assertIsNone(detected_pose.important_keypoints)
+
+        self.matcher.match_pose(detected_pose)
+        cached = detected_pose.important_keypoints
+        self.assertEqual(cached.shape, (12, 3))
+
+        self.matcher.match_pose_by_angles(detected_pose)
+        self.assertIs(detected_pose.important_keypoints, cached)
+
+    def test_library_gathers_each_dance_pose_once(self):
+        reference = self.matcher.dance_poses["Reference"]
+        self.matcher.match_pose(reference.to_pose())
+        cached = reference.important_keypoints
+        self.assertIsNotNone(cached)
+
+        self.matcher.add_dance_pose("Copy", reference.to_pose())
+        self.matcher.match_pose(reference.to_pose())
+
+        self.assertIs(reference.important_keypoints, cached)
+        self.assertIs(self.matcher.dance_poses["Copy"].important_keypoints, cached)
+
+    def test_near_identical_poses_reuse_cached_match(self):
+        reference = self.matcher.dance_poses["Reference"]
+        first = self.matcher.match_pose(reference.to_pose())
+
+        jittered = [
+            Keypoint(
+                kp.x + (0.0001 if kp.name == "RIGHT_ELBOW" else 0.0),
+                kp.y,
+                kp.confidence,
+                kp.name,
+            )
+            for kp in reference.keypoints
+        ]
+        self.assertIs(self.matcher.match_pose(Pose(jittered, 1.0)), first)
+
+        # Library edits drop cached results
+        self.matcher.add_dance_pose("Copy", reference.to_pose())
+        self.assertIsNot(self.matcher.match_pose(reference.to_pose()), first)
+
+    def test_scaled_and_shifted_pose_matches_when_normalized(self):
+        template_pose = self.matcher.dance_poses["Reference"].to_pose()
+        camera_pose = Pose(
+            [
+                Keypoint(kp.x * 640 + 200, kp.y * 640 + 40, kp.confidence, kp.name)
+                for kp in template_pose.keypoints
+            ],
+            confidence=1.0,
+        )
+
+        pose_match = self.matcher.match_pose(camera_pose)
+
+        self.assertIsNotNone(pose_match)
+        self.assertTrue(pose_match.is_perfect_match)
+        self.assertAlmostEqual(pose_match.similarity, 1.0, places=5)
+
+    def test_angle_match_is_scale_and_shift_invariant(self):
+        template_pose = self.matcher.dance_poses["Reference"].to_pose()
+        camera_pose = Pose(
+            [
+                Keypoint(kp.x * 300 + 90, kp.y * 300 + 15, kp.confidence, kp.name)
+                for kp in template_pose.keypoints
+            ],
+            confidence=1.0,
+        )
+
+        pose_match = self.matcher.match_pose_by_angles(camera_pose)
+
+        self.assertIsNotNone(pose_match)
+        self.assertEqual(pose_match.pose_name, "Reference")
+        self.assertTrue(pose_match.is_perfect_match)
+        self.assertAlmostEqual(pose_match.similarity, 1.0, places=5)
+        self.assertEqual(pose_match.matched_keypoints, pose_match.total_keypoints)
+
+    def test_angle_match_needs_enough_visible_angles(self):
+        template_pose = self.matcher.dance_poses["Reference"].to_pose()
+        left_arm = {"LEFT_SHOULDER", "LEFT_ELBOW", "LEFT_WRIST"}
+        arm_only = Pose(
+            [
+                Keypoint(kp.x, kp.y, 1.0 if kp.name in left_arm else 0.0, kp.name)
+                for kp in template_pose.keypoints
+            ],
+            confidence=1.0,
+        )
+
+        # Only the left elbow angle is measurable, and it matches exactly
+        self.assertIsNone(self.matcher.match_pose_by_angles(arm_only))
+
+    def test_mirrored_pose_matches_original(self):
+        # Left arm raised; the reference pose is left/right symmetric
+        reference_pose = self.matcher.dance_poses["Reference"].to_pose()
+        point_pose = Pose(
+            [
+                Keypoint(
+                    kp.x, kp.y - (0.4 if kp.name == "LEFT_WRIST" else 0.0), 1.0, kp.name
+                )
+                for kp in reference_pose.keypoints
+            ],
+            confidence=1.0,
+        )
+        self.matcher.add_dance_pose("Point", point_pose)
+
+        def _swap_side(name):
+            if name.startswith("LEFT_"):
+                return name.replace("LEFT_", "RIGHT_", 1)
+            return name.replace("RIGHT_", "LEFT_", 1)
+
+        mirrored_pose = Pose(
+            [
+                Keypoint(1.0 - kp.x, kp.y, kp.confidence, _swap_side(kp.name))
+                for kp in point_pose.keypoints
+            ],
+            confidence=1.0,
+        )
+
+        # Mirror invariance is opt-in
+        self.assertFalse(self.matcher.mirror_invariant)
+        strict_match = self.matcher.match_pose(mirrored_pose)
+
+        # Switching it on rebuilds the library and drops cached results
+        self.matcher.mirror_invariant = True
+        pose_match = self.matcher.match_pose(mirrored_pose)
+
+        self.assertEqual(pose_match.pose_name, "Point")
+        self.assertAlmostEqual(pose_match.similarity, 1.0, places=5)
+        self.assertLess(strict_match.similarity, pose_match.similarity)
+
+        self.matcher.mirror_invariant = False
+        self.assertEqual(self.matcher.match_pose(mirrored_pose), strict_match)
+
+    @unittest.skipIf(matcher.hnswlib is None, "hnswlib is not available")
+    def test_large_library_matches_through_index(self):
+        rng = np.random.default_rng(11)
+        for idx in range(matcher.POSE_INDEX_MIN_POSES):
+            keypoints = [
+                Keypoint(kp["x"] + dx, kp["y"] + dy, 1.0, kp["name"])
+                for kp, (dx, dy) in zip(
+                    _reference_keypoints(), rng.normal(scale=0.05, size=(12, 2))
+                )
+            ]
+            self.matcher.add_dance_pose(f"Random {idx}", Pose(keypoints, 1.0))
+
+        target = self.matcher.dance_poses["Random 42"].to_pose()
+        pose_match = self.matcher.match_pose(target)
+
+        self.assertIsNotNone(self.matcher._library_index)
+        self.assertEqual(pose_match.pose_name, "Random 42")
+
     def test_low_confidence_pose_returns_none(self):
         template_pose = self.matcher.dance_poses["Reference"].to_pose()
         low_confidence_pose = Pose(
@@ -77,6 +244,163 @@ class TestDancePoseMatcher(unittest.TestCase):
 
         self.assertIsNone(pose_match)
 
+    def test_mostly_hidden_pose_skips_library_scan(self):
+        template_pose = self.matcher.dance_poses["Reference"].to_pose()
+        # Only the shoulders and elbows are visible
+        partial_pose = Pose(
+            [
+                Keypoint(kp.x, kp.y, 1.0 if idx < 4 else 0.0, kp.name)
+                for idx, kp in enumerate(template_pose.keypoints)
+            ],
+            confidence=0.3,
+        )
+
+        with patch.object(self.matcher, "_match_arrays", side_effect=AssertionError):
+            self.assertIsNone(self.matcher.match_pose(partial_pose))
+
+
+class TestDancePoseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.poses_path = Path(self.temp_dir.name) / "poses.json"
+        # No JSON yet: writes the sample poses and their binary cache
+        self.matcher = DancePoseMatcher(str(self.poses_path))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_fresh_cache_skips_json_parsing(self):
+        self.assertTrue(self.matcher.cache_file.exists())
+
+        with patch.object(matcher, "_read_json", side_effect=AssertionError):
+            cached = DancePoseMatcher(str(self.poses_path))
+
+        self.assertEqual(cached.dance_poses, self.matcher.dance_poses)
+        for name, dance_pose in cached.dance_poses.items():
+            np.testing.assert_array_equal(
+                dance_pose.important_keypoints,
+                matcher._keypoint_array(self.matcher.dance_poses[name].to_pose()),
+            )
+
+    def test_cache_for_other_important_keypoints_is_rebuilt(self):
+        with np.load(self.matcher.cache_file, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        arrays["important_names"] = arrays["important_names"][::-1]
+        with open(self.matcher.cache_file, "wb") as f:
+            np.savez(f, **arrays)
+
+        with patch.object(matcher, "_read_json", wraps=matcher._read_json) as read:
+            reloaded = DancePoseMatcher(str(self.poses_path))
+
+        read.assert_called_once()
+        self.assertEqual(reloaded.dance_poses, self.matcher.dance_poses)
+
+    def test_stale_cache_is_rebuilt_from_json(self):
+        payload = json.loads(self.poses_path.read_text(encoding="utf-8"))
+        payload["poses"] = payload["poses"][:1]
+        self.poses_path.write_text(json.dumps(payload), encoding="utf-8")
+        # Backdate the cache so it predates the edit
+        json_mtime = self.poses_path.stat().st_mtime_ns
+        os.utime(self.matcher.cache_file, ns=(json_mtime - 10**9,) * 2)
+
+        reloaded = DancePoseMatcher(str(self.poses_path))
+        self.assertEqual(len(reloaded.dance_poses), 1)
+
+        # The rewritten cache now serves the edited file
+        with patch.object(matcher, "_read_json", side_effect=AssertionError):
+            cached = DancePoseMatcher(str(self.poses_path))
+        self.assertEqual(cached.get_pose_names(), reloaded.get_pose_names())
+
+
+class TestPoseNormalizeScale(unittest.TestCase):
+    def test_normalize_scale_sets_reference_distance_to_100(self):
+        pose = Pose(
+            [
+                Keypoint(10.0, 20.0, 0.9, "LEFT_SHOULDER"),
+                Keypoint(30.0, 20.0, 0.9, "RIGHT_SHOULDER"),
+                Keypoint(20.0, 50.0, 0.9, "NOSE"),
+                Keypoint(500.0, 500.0, 0.1, "HIDDEN"),
+            ],
+            1.0,
+        )
+
+        normalized = pose.normalize_scale(["LEFT_SHOULDER", "RIGHT_SHOULDER"])
+
+        left, right = normalized.keypoints[:2]
+        self.assertAlmostEqual(right.x - left.x, 100.0, places=4)
+        # Scaled about the centre of the visible keypoints (20, 30)
+        self.assertAlmostEqual(normalized.keypoints[2].y, 30.0 + 20.0 * 5, places=4)
+        self.assertEqual(normalized.keypoints[3].name, "HIDDEN")
+        self.assertIs(pose.normalize_scale(["LEFT_SHOULDER", "HIDDEN"]), pose)
+
+
+class TestPoseKeypoints(unittest.TestCase):
+    def test_assigning_keypoints_rebuilds_cached_arrays(self):
+        pose = Pose([Keypoint(10.0, 20.0, 0.9, "NOSE")], 1.0)
+        pose.to_points()
+        pose.important_keypoints = np.zeros((1, 3), dtype=np.float32)
+
+        pose.keypoints = [Keypoint(30.0, 40.0, 0.8, "NOSE")]
+
+        self.assertIsNone(pose.important_keypoints)
+        np.testing.assert_allclose(pose.to_array(), [[30.0, 40.0, 0.8]])
+        np.testing.assert_array_equal(pose.to_points(), [[30, 40]])
+        self.assertIn("Keypoint(x=30.0, y=40.0", repr(pose))
+
+
+class TestMatchKernels(unittest.TestCase):
+    @unittest.skipUnless(_jit.NUMBA_AVAILABLE, "Numba is not available")
+    def test_numba_kernel_matches_numpy_kernel(self):
+        rng = np.random.default_rng(7)
+        detected_xy = (rng.normal(size=(12, 2)) * 50).astype(np.float32)
+        detected_mask = rng.random(12) > 0.2
+        library_xy = (rng.normal(size=(20, 12, 2)) * 50).astype(np.float32)
+        library_mask = rng.random((20, 12)) > 0.2
+        library_mask[0] = False  # no overlapping joints -> inf
+
+        expected = _jit._masked_pose_distances_numpy(
+            detected_xy, detected_mask, library_xy, library_mask, 30.0
+        )
+        actual = _jit._masked_pose_distances_numba(
+            detected_xy, detected_mask, library_xy, library_mask, 30.0
+        )
+
+        np.testing.assert_allclose(actual[0], expected[0], rtol=1e-4)
+        np.testing.assert_array_equal(actual[1], expected[1])
+
+    def test_half_precision_library_matches_single_precision(self):
+        rng = np.random.default_rng(5)
+        detected_xy = (rng.normal(size=(12, 2)) * 100).astype(np.float32)
+        detected_mask = np.ones(12, dtype=bool)
+        library_xy = (rng.normal(size=(50, 12, 2)) * 100).astype(np.float32)
+        library_mask = rng.random((50, 12)) > 0.1
+
+        expected = _jit._masked_pose_distances_numpy(
+            detected_xy, detected_mask, library_xy, library_mask, 30.0
+        )
+        actual = _jit._masked_pose_distances_numpy(
+            detected_xy,
+            detected_mask,
+            library_xy.astype(np.float16),
+            library_mask,
+            30.0,
+        )
+
+        np.testing.assert_allclose(actual[0], expected[0], rtol=1e-3)
+
+    def test_batched_normalization_matches_single_pose(self):
+        rng = np.random.default_rng(3)
+        keypoints = np.concatenate(
+            [rng.random((4, 12, 2)) * 500, np.ones((4, 12, 1))], axis=-1
+        ).astype(np.float32)
+        keypoints[1, 0, 2] = 0.0  # left shoulder hidden -> left unscaled
+
+        batched = _normalize_xy(keypoints)
+
+        for pose, expected in zip(keypoints, batched):
+            np.testing.assert_allclose(_normalize_xy(pose), expected, rtol=1e-6)
+        np.testing.assert_array_equal(batched[1], keypoints[1, :, :2])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,15 @@
 import unittest
 from types import SimpleNamespace
+from unittest.mock import patch
 
-from config.settings import TARGET_FPS
+import numpy as np
+
+from config.settings import (
+    IMPORTANT_KEYPOINT_NAMES,
+    POSE_INFERENCE_HEIGHT,
+    POSE_INFERENCE_WIDTH,
+    TARGET_FPS,
+)
 
 try:
     from core.pose.tracker import PoseTracker
@@ -9,6 +17,25 @@ except Exception:  # pragma: no cover - only hit when mediapipe is unavailable
     PoseTracker = None
 
 
+def _fake_landmarks(x=0.5, y=0.5, visibility=0.9):
+    """
+    MediaPipe-style landmarks for all 33 joints
+    x and visibility take a single value or one per joint; visibility=None
+    leaves the attribute out, like models that don't report it.
+    """
+
+    def _at(value, idx):
+        return value[idx] if isinstance(value, (list, tuple)) else value
+
+    landmark = []
+    for idx in range(33):
+        point = SimpleNamespace(x=_at(x, idx), y=y)
+        if visibility is not None:
+            point.visibility = _at(visibility, idx)
+        landmark.append(point)
+    return SimpleNamespace(landmark=landmark)
+
+
 @unittest.skipIf(PoseTracker is None, "MediaPipe is not available")
 class TestPoseTracker(unittest.TestCase):
     def setUp(self):
@@ -20,32 +47,160 @@ class TestPoseTracker(unittest.TestCase):
     def test_process_frame_with_none_returns_empty_list(self):
         self.assertEqual(self.tracker.process_frame(None), [])
 
+    def test_process_frame_passes_contiguous_uint8_to_mediapipe(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        inference_frame = np.zeros((360, 960, 3), dtype=np.uint8)[:, ::2]
+        no_pose = SimpleNamespace(pose_landmarks=None)
+
+        with patch.object(
+            self.tracker.pose, "process", return_value=no_pose
+        ) as mock_process:
+            self.tracker.process_frame(frame, inference_frame)
+
+        rgb_frame = mock_process.call_args.args[0]
+        self.assertEqual(rgb_frame.dtype, np.uint8)
+        self.assertTrue(rgb_frame.flags.c_contiguous)
+
+    def test_process_frame_reuses_preprocessing_buffers(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        frame[..., 0] = 255  # blue in BGR
+        no_pose = SimpleNamespace(pose_landmarks=None)
+        self.tracker.frame_skip = 0
+
+        with patch.object(
+            self.tracker.pose, "process", return_value=no_pose
+        ) as mock_process:
+            self.tracker.process_frame(frame)
+            self.tracker.process_frame(frame)
+
+        first, second = [call.args[0] for call in mock_process.call_args_list]
+        self.assertIs(first, second)
+        self.assertEqual(first.shape, (POSE_INFERENCE_HEIGHT, POSE_INFERENCE_WIDTH, 3))
+        self.assertTrue((first[..., 2] == 255).all())
+
+    def test_skipped_frames_reuse_last_pose(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        detected = SimpleNamespace(pose_landmarks=_fake_landmarks())
+        self.tracker.frame_skip = 1
+
+        with patch.object(
+            self.tracker.pose, "process", return_value=detected
+        ) as mock_process:
+            first = self.tracker.process_frame(frame)
+            second = self.tracker.process_frame(frame)
+            self.tracker.process_frame(frame)
+
+        self.assertEqual(mock_process.call_count, 2)
+        self.assertIs(second[0], first[0])
+
+        self.tracker.reset()
+        self.assertEqual(self.tracker.frame_count, 0)
+        self.assertIsNone(self.tracker._last_pose)
+
+    def test_async_inference_returns_pose_on_a_later_frame(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        detected = SimpleNamespace(pose_landmarks=_fake_landmarks())
+
+        with PoseTracker(frame_skip=0, async_inference=True) as tracker:
+            with patch.object(tracker.pose, "process", return_value=detected):
+                self.assertEqual(tracker.process_frame(frame), [])
+                tracker._pending.result(timeout=5)
+
+                poses = tracker.process_frame(frame)
+
+        self.assertEqual(len(poses), 1)
+        self.assertAlmostEqual(poses[0].timestamp, 1 / float(TARGET_FPS))
+
+    def test_reset_drops_in_flight_inference(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        detected = SimpleNamespace(pose_landmarks=_fake_landmarks())
+
+        with PoseTracker(frame_skip=0, async_inference=True) as tracker:
+            with patch.object(tracker.pose, "process", return_value=detected):
+                tracker.process_frame(frame)
+                tracker.reset()
+
+                self.assertIsNone(tracker._pending)
+                # The pre-reset pose never comes back
+                self.assertEqual(tracker.process_frame(frame), [])
+                self.assertEqual(tracker.frame_count, 1)
+
     def test_landmarks_to_pose_maps_coordinates_and_metadata(self):
-        fake_landmarks = SimpleNamespace(
-            landmark=[
-                SimpleNamespace(x=0.5, y=0.5, visibility=0.9) for _ in range(33)
-            ]
-        )
         self.tracker.frame_count = 15
 
-        pose = self.tracker._landmarks_to_pose(fake_landmarks, 640, 480)
+        pose = self.tracker._landmarks_to_pose(_fake_landmarks(), 640, 480)
 
         self.assertIsNotNone(pose)
         self.assertEqual(len(pose.keypoints), 33)
         self.assertEqual(pose.person_id, 0)
         self.assertAlmostEqual(pose.timestamp, 15 / float(TARGET_FPS))
 
-    def test_landmarks_to_pose_returns_none_when_no_visible_keypoints(self):
-        invisible_landmarks = SimpleNamespace(
-            landmark=[
-                SimpleNamespace(x=0.5, y=0.5, visibility=0.1) for _ in range(33)
-            ]
+    def test_landmarks_to_pose_slices_important_keypoints(self):
+        fake_landmarks = _fake_landmarks(x=[idx / 33.0 for idx in range(33)])
+
+        pose = self.tracker._landmarks_to_pose(fake_landmarks, 640, 480)
+
+        self.assertEqual(pose.important_keypoints.shape, (12, 3))
+        for row, name in enumerate(IMPORTANT_KEYPOINT_NAMES):
+            keypoint = pose.get_keypoint_by_name(name)
+            self.assertAlmostEqual(pose.important_keypoints[row, 0], keypoint.x, 3)
+
+    def test_landmarks_to_pose_keeps_keypoint_array_for_bounding_box(self):
+        fake_landmarks = _fake_landmarks(
+            x=[0.25 + idx / 100.0 for idx in range(33)],
+            visibility=[0.9 if idx < 20 else 0.1 for idx in range(33)],
         )
 
+        pose = self.tracker._landmarks_to_pose(fake_landmarks, 640, 480)
+
+        self.assertEqual(pose.keypoint_array.shape, (33, 3))
+        # Keypoint objects are only materialised on demand
+        self.assertIsNone(pose._keypoints)
+        self.assertEqual(pose.keypoints[32].name, "RIGHT_FOOT_INDEX")
+        self.assertEqual(pose.get_bounding_box(), (160, 240, 121, 0))
+
+        points = pose.to_points()
+        self.assertEqual(points.dtype, np.int32)
+        self.assertEqual(tuple(points[32]), pose.keypoints[32].to_tuple())
+        self.assertIs(pose.to_points(), points)
+
+        # Replacing the keypoint array invalidates the cached points
+        pose.keypoint_array = pose.keypoint_array + np.float32(10.0)
+        self.assertEqual(tuple(pose.to_points()[32]), tuple(points[32] + 10))
+
+    def test_landmarks_to_pose_returns_none_when_no_visible_keypoints(self):
+        invisible_landmarks = _fake_landmarks(visibility=0.1)
+
         pose = self.tracker._landmarks_to_pose(invisible_landmarks, 640, 480)
 
         self.assertIsNone(pose)
 
+    def test_landmarks_without_visibility_count_as_confident(self):
+        fake_landmarks = _fake_landmarks(y=0.25, visibility=None)
+
+        pose = self.tracker._landmarks_to_pose(fake_landmarks, 640, 480)
+
+        self.assertAlmostEqual(pose.confidence, 1.0)
+        np.testing.assert_allclose(pose.to_array()[0], [320.0, 120.0, 1.0])
+
+    def test_landmarks_to_pose_returns_none_without_landmarks(self):
+        pose = self.tracker._landmarks_to_pose(SimpleNamespace(landmark=[]), 640, 480)
+
+        self.assertIsNone(pose)
+
+    def test_mirror_flips_coordinates_and_swaps_sides(self):
+        fake_landmarks = _fake_landmarks(x=[idx / 40.0 for idx in range(33)])
+        plain = self.tracker._landmarks_to_pose(fake_landmarks, 640, 480)
+
+        self.tracker.mirror = True
+        mirrored = self.tracker._landmarks_to_pose(fake_landmarks, 640, 480)
+
+        left = mirrored.get_keypoint_by_name("LEFT_WRIST")
+        right = plain.get_keypoint_by_name("RIGHT_WRIST")
+        self.assertAlmostEqual(left.x, 640 - right.x, 3)
+        nose = mirrored.get_keypoint_by_name("NOSE")
+        self.assertAlmostEqual(nose.x, 640 - plain.get_keypoint_by_name("NOSE").x, 3)
+
 
 if __name__ == "__main__":
     unittest.main()